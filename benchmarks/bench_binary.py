@@ -0,0 +1,69 @@
+"""
+Compare the size and speed of `Entity.to_bytes()` and `Entity.from_bytes()`
+with `Entity.to_json()` and `Entity.from_json()`.
+
+Run from the repository root::
+
+    python benchmarks/bench_binary.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from springfield import Entity, fields  # noqa: E402
+from springfield.timeutil import utc  # noqa: E402
+
+NUMBER = 20000
+
+
+class Tag(Entity):
+    name = fields.StringField()
+
+
+class Record(Entity):
+    id = fields.IntField()
+    score = fields.FloatField()
+    active = fields.BooleanField()
+    name = fields.StringField()
+    created = fields.DateTimeField()
+    tags = fields.CollectionField(fields.EntityField(Tag))
+    counts = fields.CollectionField(fields.IntField())
+
+
+RECORD = Record(
+    id=12345,
+    score=1.25,
+    active=True,
+    name='hello world',
+    created=datetime(2020, 1, 2, 3, 4, 5, tzinfo=utc),
+    tags=[{'name': 'a'}, {'name': 'b'}],
+    counts=list(range(20)),
+)
+
+
+def bench(name, func):
+    seconds = timeit.timeit(func, number=NUMBER)
+    print('  %-12s %8.2f us' % (name, seconds / NUMBER * 1e6))
+
+
+def main():
+    data = RECORD.to_bytes()
+    text = RECORD.to_json()
+    print('Size: %d bytes, JSON %d bytes' % (len(data), len(text)))
+
+    print('Encode')
+    bench('to_bytes', RECORD.to_bytes)
+    bench('to_json', RECORD.to_json)
+
+    print('Decode')
+    bench('from_bytes', lambda: Record.from_bytes(data))
+    bench('from_json', lambda: Record.from_json(text))
+
+
+if __name__ == '__main__':
+    main()
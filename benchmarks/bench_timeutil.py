@@ -0,0 +1,90 @@
+"""
+Compare `springfield.timeutil` date parsing and formatting with the
+implementations it replaced.
+
+Run from the repository root::
+
+    python benchmarks/bench_timeutil.py
+
+`dateutil` and `pyrfc3339` are benchmarked too if they are installed.
+"""
+from __future__ import print_function
+
+import os
+import re
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from springfield.timeutil import date_parse, generate_rfc3339, parse_rfc3339, utc  # noqa: E402
+
+NUMBER = 100000
+
+STRINGS = [
+    '2020-01-02T03:04:05Z',
+    '2020-01-02T03:04:05.123456Z',
+    '2020-01-02T03:04:05.123+02:00',
+]
+
+VALUE = parse_rfc3339('2020-01-02T03:04:05.123+02:00')
+
+
+def old_regex_parse(date):
+    # The previous fallback, which ignored offsets and fractional seconds
+    return datetime(*map(int, re.split(r'[^\d]', date)[:-1])).replace(tzinfo=utc)
+
+
+def old_strftime_generate(value):
+    # The previous fallback formatter
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=utc)
+    value = value.astimezone(utc)
+    return value.strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
+
+
+def bench(name, func, arg):
+    try:
+        func(arg)
+    except (TypeError, ValueError):
+        print('  %-24s %11s' % (name, 'unsupported'))
+        return
+    seconds = timeit.timeit(lambda: func(arg), number=NUMBER)
+    print('  %-24s %8.2f us' % (name, seconds / NUMBER * 1e6))
+
+
+def main():
+    parsers = [
+        ('parse_rfc3339', parse_rfc3339),
+        ('date_parse', date_parse),
+        ('old regex split', old_regex_parse),
+    ]
+    try:
+        from dateutil.parser import parse
+        parsers.append(('dateutil', parse))
+    except ImportError:
+        pass
+
+    for string in STRINGS:
+        print('Parse %s' % string)
+        for name, func in parsers:
+            bench(name, func, string)
+
+    generators = [
+        ('generate_rfc3339', generate_rfc3339),
+        ('old strftime', old_strftime_generate),
+    ]
+    try:
+        from pyrfc3339 import generate
+        generators.append(('pyrfc3339', lambda value: generate(value, accept_naive=True)))
+    except ImportError:
+        pass
+
+    print('Generate %r' % VALUE)
+    for name, func in generators:
+        bench(name, func, VALUE)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
-from springfield.entity import Entity, FlexEntity
+from springfield.entity import Entity, FlexEntity, CompactEntity
 from springfield.types import Empty
 
 __all__ = [
     'Entity',
     'FlexEntity',
+    'CompactEntity',
     'Empty'
 ]
\ No newline at end of file
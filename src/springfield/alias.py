@@ -1,4 +1,4 @@
-from springfield.fields import EntityField
+from springfield.path import get_path
 
 class AliasDescriptor(object):
     """
@@ -21,27 +21,13 @@ class AliasDescriptor(object):
         if instance is None:
             return self
 
-        # Get value from document instance if available, if not use default
-        value = instance.__values__.get(self.name)
-        if value is Empty:
-            value = self.field.default
-            # Allow callable default values
-            if callable(value):
-                value = self.field.adapt(value())
-            if value is Empty:
-                value = None
-        return value
+        return self.alias.get(instance)
 
     def __set__(self, instance, value):
         """
         Set a value for this :class:`Alias`.
         """
-        if value is Empty:
-            if self.name in instance.__values__:
-                del instance.__values__[self.name]
-        else:
-            instance.__values__[self.name] = self.field.adapt(value)
-        instance.__changes__.add(self.name)
+        self.alias.set(instance, value)
 
 class Alias(object):
     """
@@ -57,36 +43,14 @@ class Alias(object):
         self.__doc__ = doc
         self.target = target
 
-    def _get_value(self, entity, target):
-        if '.' in target:
-            root, right = target.split('.', 1)
-            return self._get_value(entity[root], right)
-        else:
-            return entity[target]
-
-    def _set_value(self, entity, target, value):
-        if '.' in target:
-            root, right = target.split('.', 1)
-            return self._set_value(entity[root], right, value)
-        else:
-            entity[target] = value
-
     def _get_field(self, entity, target):
-        if '.' in target:
-            name, right = target.split('.', 1)
-            field = entity.__fields__[name]
-            if isinstance(field, EntityField):
-                return self._get_field(field.type, right)
-            else:
-                raise KeyError('Unexpected field type for %s' % name)
-        else:
-            return entity.__fields__[target]
+        return get_path(entity, target).field
 
     def get(self, entity):
-        return self._get_value(entity, self.target)
+        return get_path(type(entity), self.target).get(entity)
 
     def set(self, entity, value):
-        self._set_value(entity, self.target, value)
+        get_path(type(entity), self.target).set(entity, value)
 
     def init(self, cls):
         """
@@ -101,4 +65,4 @@ class Alias(object):
         Create a descriptor for this :class:`Alias` to attach to
         an :class:`Entity`.
         """
-        return AliasDescriptor(name=name, alias=self)
\ No newline at end of file
+        return AliasDescriptor(name=name, alias=self)
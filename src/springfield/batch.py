@@ -0,0 +1,323 @@
+"""
+Columnar storage for many entities of the same class.
+
+An :class:`EntityBatch` keeps one column per field instead of one object
+per entity. If `NumPy <https://numpy.org/>`_ is installed, `IntField`,
+`FloatField` and `BooleanField` columns are typed NumPy arrays,
+`DateTimeField` columns are ``datetime64[us]`` arrays and other columns
+are object arrays. Without NumPy, columns are lists.
+
+Numeric columns can not tell a field that was set to ``None`` from a
+field that was never set, both are treated as missing.
+"""
+from springfield import fields
+from springfield.timeutil import utc
+from springfield.types import Empty
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _column_dtype(field):
+    """
+    Get the NumPy dtype for the values of `field`.
+    """
+    if isinstance(field, fields.BooleanField):
+        return numpy.bool_
+    elif isinstance(field, fields.IntField):
+        return numpy.int64
+    elif isinstance(field, fields.FloatField):
+        return numpy.float64
+    elif isinstance(field, fields.DateTimeField):
+        return 'datetime64[us]'
+    return object
+
+
+class Column(object):
+    """
+    The values of one field for every row of an :class:`EntityBatch`.
+    """
+    def __init__(self, values, missing, aware=False):
+        #: The values, ``None`` or a placeholder where values are missing
+        self.values = values
+
+        #: ``True`` for rows without a value, or ``None`` if no values are missing
+        self.missing = missing
+
+        #: Whether datetime values should be returned in UTC
+        self.aware = aware
+
+    @classmethod
+    def from_values(cls, field, values):
+        """
+        Build a column from a list of values, using :data:`Empty` for missing values.
+        """
+        missing = [v is Empty or v is None for v in values]
+        if not any(missing):
+            missing = None
+
+        if numpy is None:
+            if missing is not None:
+                values = [None if m else v for v, m in zip(values, missing)]
+            return cls(list(values), missing)
+
+        if missing is not None:
+            missing = numpy.array(missing, dtype=numpy.bool_)
+
+        dtype = _column_dtype(field)
+        aware = False
+        if dtype == 'datetime64[us]':
+            present = [v for v in values if v is not Empty and v is not None]
+            aware = any(v.tzinfo is not None for v in present)
+            if aware and not all(v.tzinfo is not None for v in present):
+                # Mixed naive and aware datetimes can't share a column
+                dtype = object
+            elif aware:
+                values = [v if v is Empty or v is None else v.astimezone(utc).replace(tzinfo=None) for v in values]
+
+        if dtype is not object:
+            fill = numpy.zeros(1, dtype=dtype)[0]
+            try:
+                array = numpy.array([fill if v is Empty or v is None else v for v in values], dtype=dtype)
+            except (OverflowError, TypeError, ValueError):
+                dtype = object
+            else:
+                return cls(array, missing, aware)
+
+        array = numpy.empty(len(values), dtype=object)
+        for i, v in enumerate(values):
+            array[i] = None if v is Empty else v
+        return cls(array, missing)
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, index):
+        """
+        Get the value of a row as a Python object, or :data:`Empty` if it is missing.
+        """
+        if self.missing is not None and self.missing[index]:
+            return Empty
+
+        value = self.values[index]
+        if numpy is not None and isinstance(value, numpy.generic):
+            value = value.item()
+            if self.aware:
+                value = value.replace(tzinfo=utc)
+        return value
+
+    def data(self):
+        """
+        Get the values for aggregates, as a NumPy masked array if values are missing.
+        """
+        if numpy is not None and self.missing is not None:
+            return numpy.ma.MaskedArray(self.values, mask=self.missing)
+        return self.values
+
+    def take(self, index):
+        """
+        Get a new column with the rows selected by a slice, or by an index
+        array if NumPy is installed.
+        """
+        missing = None
+        if self.missing is not None:
+            missing = self.missing[index]
+        return Column(self.values[index], missing, self.aware)
+
+
+class _Unset(object):
+    """
+    Stands in for an entity without values, to read fields that aren't set.
+    """
+    __slots__ = ('__values__',)
+
+    def __init__(self, entity):
+        self.__values__ = entity.__values_class__()
+
+
+class RowView(object):
+    """
+    A lightweight view of one row of an :class:`EntityBatch` that can be
+    read like an entity.
+    """
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch, index):
+        self._batch = batch
+        self._index = index
+
+    def __getattr__(self, name):
+        batch = self._batch
+        column = batch.columns.get(name)
+        value = Empty if column is None else column.get(self._index)
+        if value is Empty:
+            field = batch.entity.__fields__.get(name)
+            if field is None:
+                raise AttributeError(name)
+            # Read it like the field's descriptor does, e.g. for defaults
+            return field.get(_Unset(batch.entity), name)
+        return value
+
+    def __getitem__(self, name):
+        if '.' in name:
+            return self._batch.entity.path(name).get(self)
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        column = self._batch.columns.get(name)
+        return column is not None and column.get(self._index) is not Empty
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, RowView):
+            other = other.to_entity()
+        return self.to_entity() == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<RowView %d of %r>' % (self._index, self.to_entity())
+
+    def keys(self):
+        return [name for name in self._batch.columns if name in self]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.keys()]
+
+    def to_entity(self):
+        """
+        Materialize the row as an entity.
+        """
+        return self._batch.entity(**dict(self.items()))
+
+    def flatten(self):
+        return self.to_entity().flatten()
+
+    def jsonify(self):
+        return self.to_entity().jsonify()
+
+
+class EntityBatch(object):
+    """
+    A column per field for a list of entities of the same class.
+    """
+    def __init__(self, entity, columns, size):
+        """
+        Use :meth:`from_entities` to create a batch.
+
+        :param entity: The :class:`Entity` class of the rows
+        :param columns: A `dict` of field names to :class:`Column`
+        :param size: The number of rows
+        """
+        self.entity = entity
+        self.columns = columns
+        self.size = size
+
+    @classmethod
+    def from_entities(cls, entity, entities):
+        """
+        Build a batch from an iterable of entities.
+
+        :param entity: The :class:`Entity` class of the rows
+        :param entities: Instances of `entity`
+        """
+        names = [name for name, field in entity.__fields__.items() if isinstance(field, fields.Field)]
+        values = dict((name, []) for name in names)
+        size = 0
+        for item in entities:
+            item.materialize()
+            item_values = item.__values__
+            for name in names:
+                values[name].append(item_values.get(name, Empty))
+            size += 1
+
+        columns = dict(
+            (name, Column.from_values(entity.__fields__[name], values[name]))
+            for name in names
+        )
+        return cls(entity, columns, size)
+
+    @classmethod
+    def from_columns(cls, entity, columns):
+        """
+        Build a batch from columns of values, such as the columns of a CSV
+        file or database result. Each column is adapted with
+        :meth:`Field.adapt_many`, so numeric NumPy arrays are adapted in bulk.
+
+        :param entity: The :class:`Entity` class of the rows
+        :param columns: A `dict` of field names to sequences of values of the
+                        same length. Use ``None`` or :data:`Empty` for missing
+                        values.
+        :raises AdaptManyError: If values of a column could not be adapted
+        :raises KeyError: If a column isn't a field of `entity`
+        """
+        for name in columns:
+            if name not in entity.__fields__:
+                raise KeyError('Field %r not defined.' % name)
+
+        sizes = set(len(values) for values in columns.values())
+        if len(sizes) > 1:
+            raise ValueError('Columns must have the same length')
+        size = sizes.pop() if sizes else 0
+
+        result = {}
+        for name, field in entity.__fields__.items():
+            if not isinstance(field, fields.Field):
+                continue
+            values = columns.get(name)
+            if values is None:
+                values = [Empty] * size
+            else:
+                values = field.adapt_many(values)
+
+            if numpy is not None and isinstance(values, numpy.ndarray) and values.dtype == _column_dtype(field):
+                result[name] = Column(values, None)
+            else:
+                result[name] = Column.from_values(field, list(values))
+        return cls(entity, result, size)
+
+    def to_entities(self):
+        """
+        Materialize every row as an entity.
+        """
+        return [row.to_entity() for row in self]
+
+    def column(self, name):
+        """
+        Get the values of a field for every row. See :meth:`Column.data`.
+        """
+        return self.columns[name].data()
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield RowView(self, i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            columns = dict((name, column.take(index)) for name, column in self.columns.items())
+            return EntityBatch(self.entity, columns, len(range(*index.indices(self.size))))
+
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('EntityBatch index out of range')
+        return RowView(self, index)
+
+    def __repr__(self):
+        return '<EntityBatch %s x %d>' % (self.entity.__name__, self.size)
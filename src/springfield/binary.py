@@ -0,0 +1,425 @@
+"""
+A compact binary encoding for entities.
+
+Field names are not repeated for every record. Each field is identified by
+its index in the sorted names of the class's fields, and values of the
+common field types have a native encoding:
+
+* `IntField`: zigzag variable-length integers
+* `FloatField`: 8-byte IEEE 754 doubles
+* `BooleanField`: one byte
+* `DateTimeField`: microseconds since the epoch and the UTC offset
+* `StringField` and `BytesField`: length-prefixed UTF-8 or bytes
+* `EntityField` and `CollectionField`: nested records and lists, with lists
+  of `IntField` and `FloatField` values packed into arrays. Instances of
+  subclasses of an `EntityField`'s type are encoded as JSON.
+
+Values of other fields are encoded as the JSON of :meth:`Field.jsonify`.
+
+Every document starts with a header that has a fingerprint of the schema,
+so decoding with a class whose fields have changed raises a `ValueError`::
+
+    data = user.to_bytes()
+    user = User.from_bytes(data)
+"""
+import hashlib
+import json
+import struct
+from datetime import datetime, timedelta
+
+from anticipate.adapt import AdaptError
+from six import PY2, text_type
+
+from springfield import fields
+from springfield.timeutil import _offset_tzinfo
+
+_header = struct.Struct('<2sBI')
+_double = struct.Struct('<d')
+
+MAGIC = b'SF'
+VERSION = 1
+
+_epoch = datetime(1970, 1, 1)
+
+# Collections of items encoded one by one, otherwise the `struct` code of packed items
+_ITEMS = 0
+
+_INT_CODES = (('b', 8), ('h', 16), ('i', 32), ('q', 64))
+
+# Entities encoded with the codec of the field's type, otherwise as JSON
+_BODY = 0
+_JSON = 1
+
+
+def _write_varint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(buf, pos):
+    n = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _write_int(out, value):
+    # Zigzag so small negative numbers are small too
+    _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+
+
+def _read_int(buf, pos):
+    n = buf[pos]
+    if n < 0x80:
+        pos += 1
+    else:
+        n, pos = _read_varint(buf, pos)
+    return (n >> 1) ^ -(n & 1), pos
+
+
+def _write_float(out, value):
+    out += _double.pack(value)
+
+
+def _read_float(buf, pos):
+    return _double.unpack_from(buf, pos)[0], pos + 8
+
+
+def _write_bool(out, value):
+    out.append(1 if value else 0)
+
+
+def _read_bool(buf, pos):
+    return buf[pos] != 0, pos + 1
+
+
+def _write_bytes(out, value):
+    _write_varint(out, len(value))
+    out += value
+
+
+def _read_bytes(buf, pos):
+    size, pos = _read_varint(buf, pos)
+    end = pos + size
+    if end > len(buf):
+        raise ValueError('Unexpected end of data')
+    return bytes(buf[pos:end]), end
+
+
+def _write_text(out, value):
+    _write_bytes(out, value.encode('utf-8'))
+
+
+def _read_text(buf, pos):
+    value, pos = _read_bytes(buf, pos)
+    return value.decode('utf-8'), pos
+
+
+def _write_datetime(out, value):
+    offset = value.utcoffset()
+    if offset is None:
+        # Naive
+        _write_varint(out, 0)
+    else:
+        minutes = offset.days * 1440 + offset.seconds // 60
+        _write_varint(out, (minutes * 2 if minutes >= 0 else -minutes * 2 - 1) + 1)
+        value = value.replace(tzinfo=None) - offset
+
+    delta = value - _epoch
+    _write_int(out, (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+
+def _read_datetime(buf, pos):
+    tz, pos = _read_varint(buf, pos)
+    microseconds, pos = _read_int(buf, pos)
+    value = _epoch + timedelta(microseconds=microseconds)
+    if tz:
+        tz -= 1
+        minutes = (tz >> 1) ^ -(tz & 1)
+        tzinfo = _offset_tzinfo(minutes)
+        value = (value + timedelta(minutes=minutes)).replace(tzinfo=tzinfo)
+    return value, pos
+
+
+def _json_codec(field):
+    def write(out, value):
+        _write_text(out, text_type(json.dumps(field.jsonify(value))))
+
+    def read(buf, pos):
+        value, pos = _read_text(buf, pos)
+        return field.adapt(json.loads(value)), pos
+    return write, read
+
+
+def _entity_codec(field):
+    # Instances of subclasses may have fields the codec of the field's
+    # type doesn't know, so they're encoded as JSON and adapted back
+    write_json, read_json = _json_codec(field)
+
+    def write(out, value):
+        if type(value) is fields.LazyValue:
+            value = value.materialize()
+        entity = field.type
+        if type(value) is entity:
+            out.append(_BODY)
+            get_codec(entity).write_body(out, value)
+        else:
+            out.append(_JSON)
+            write_json(out, value)
+
+    def read(buf, pos):
+        encoding = buf[pos]
+        if encoding == _BODY:
+            return get_codec(field.type).read_body(buf, pos + 1)
+        elif encoding == _JSON:
+            return read_json(buf, pos + 1)
+        raise ValueError('Unknown entity encoding %d' % encoding)
+    return write, read
+
+
+def _int_code(items):
+    """
+    Get the `struct` code of the narrowest integers that fit `items`.
+    """
+    low = min(items)
+    high = max(items)
+    for code, bits in _INT_CODES:
+        limit = 1 << (bits - 1)
+        if -limit <= low and high < limit:
+            return code
+    return None
+
+
+def _float_code(items):
+    return 'd'
+
+
+def _collection_codec(field):
+    write_item, read_item = _field_codec(field.field)
+    if isinstance(field.field, fields.BooleanField):
+        get_code = None
+    elif isinstance(field.field, fields.IntField):
+        get_code = _int_code
+    elif isinstance(field.field, fields.FloatField):
+        get_code = _float_code
+    else:
+        get_code = None
+
+    def write(out, value):
+        if type(value) is fields.LazyValue:
+            value = value.materialize()
+        items = list(value)
+        _write_varint(out, len(items))
+        if get_code is not None and items and None not in items:
+            try:
+                code = get_code(items)
+                packed = code and struct.pack('<%d%s' % (len(items), code), *items)
+            except (TypeError, struct.error):
+                packed = None
+            if packed:
+                out.append(ord(code))
+                out += packed
+                return
+
+        out.append(_ITEMS)
+        for item in items:
+            if item is None:
+                out.append(0)
+            else:
+                out.append(1)
+                write_item(out, item)
+
+    def read(buf, pos):
+        size, pos = _read_varint(buf, pos)
+        encoding = buf[pos]
+        pos += 1
+        if encoding != _ITEMS:
+            packed = struct.Struct('<%d%s' % (size, chr(encoding)))
+            return list(packed.unpack_from(buf, pos)), pos + packed.size
+
+        items = []
+        for i in range(size):
+            present = buf[pos]
+            pos += 1
+            if present:
+                item, pos = read_item(buf, pos)
+            else:
+                item = None
+            items.append(item)
+        return items, pos
+    return write, read
+
+
+def _field_codec(field):
+    """
+    Get the functions that write a value of `field` to a `bytearray` and
+    read it from a `memoryview`.
+    """
+    if isinstance(field, fields.BooleanField):
+        return _write_bool, _read_bool
+    elif isinstance(field, fields.IntField):
+        return _write_int, _read_int
+    elif isinstance(field, fields.FloatField):
+        return _write_float, _read_float
+    elif isinstance(field, fields.DateTimeField):
+        return _write_datetime, _read_datetime
+    elif isinstance(field, fields.BytesField):
+        return _write_bytes, _read_bytes
+    elif isinstance(field, fields.StringField):
+        return _write_text, _read_text
+    elif isinstance(field, fields.EntityField):
+        return _entity_codec(field)
+    elif isinstance(field, fields.CollectionField):
+        return _collection_codec(field)
+    return _json_codec(field)
+
+
+def _describe(field, seen):
+    name = field.__class__.__name__
+    if isinstance(field, fields.CollectionField):
+        return '%s(%s)' % (name, _describe(field.field, seen))
+    elif isinstance(field, fields.EntityField):
+        entity = field.type
+        if entity in seen:
+            return '%s(%s)' % (name, entity.__name__)
+        return '%s(%s)' % (name, _schema(entity, seen | set([entity])))
+    return name
+
+
+def _schema(entity, seen):
+    return ','.join(
+        '%s:%s' % (name, _describe(field, seen))
+        for name, field in sorted(entity.__fields__.items())
+    )
+
+
+def fingerprint(entity):
+    """
+    Get a 32-bit fingerprint of the fields of an :class:`Entity` class,
+    including the fields of nested entities.
+    """
+    schema = _schema(entity, set([entity]))
+    return struct.unpack('<I', hashlib.sha1(schema.encode('utf-8')).digest()[:4])[0]
+
+
+def get_codec(entity):
+    """
+    Get the :class:`Codec` of an :class:`Entity` class, creating it if needed.
+    """
+    codec = entity.__codec__
+    if codec is None:
+        codec = entity.__codec__ = Codec(entity)
+    return codec
+
+
+class Codec(object):
+    """
+    Encodes and decodes entities of one :class:`Entity` class.
+
+    Use :meth:`Entity.to_bytes`, :meth:`Entity.from_bytes` or
+    :func:`get_codec` rather than creating one directly.
+    """
+    def __init__(self, entity):
+        self.entity = entity
+
+        #: The field names in index order
+        self.names = entity.__field_order__
+
+        self.fingerprint = fingerprint(entity)
+        self._codecs = [_field_codec(entity.__fields__[name]) for name in self.names]
+
+        # The encoded keys of each field when it has a value and when it's None
+        self._writers = {}
+        for index, name in enumerate(self.names):
+            key = bytearray()
+            _write_varint(key, index * 2)
+            none_key = bytearray()
+            _write_varint(none_key, index * 2 + 1)
+            self._writers[name] = (bytes(key), bytes(none_key), self._codecs[index][0])
+
+    def encode(self, entity):
+        """
+        Encode an entity.
+
+        :returns: `bytes`
+        """
+        out = bytearray(_header.pack(MAGIC, VERSION, self.fingerprint))
+        self.write_body(out, entity)
+        return bytes(out)
+
+    def decode(self, data):
+        """
+        Decode an entity from `bytes`, a `bytearray` or a `memoryview`.
+
+        :raises ValueError: If `data` isn't for this class or is corrupt
+        """
+        if PY2:
+            # Indexing a `memoryview` gets `str` rather than `int` on Python 2
+            buf = bytearray(data)
+        else:
+            buf = memoryview(data)
+            if buf.format != 'B':
+                buf = buf.cast('B')
+        if len(buf) < _header.size:
+            raise ValueError('Not an encoded entity')
+        magic, version, fingerprint = _header.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not an encoded entity')
+        if fingerprint != self.fingerprint:
+            raise ValueError('Data was encoded with different fields than %s' % self.entity.__name__)
+        try:
+            entity, pos = self.read_body(buf, _header.size)
+        except (AdaptError, IndexError, KeyError, OverflowError, TypeError, struct.error) as e:
+            raise ValueError('Corrupt data for %s: %s' % (self.entity.__name__, e))
+        if pos != len(buf):
+            raise ValueError('Unexpected data after the entity')
+        return entity
+
+    def write_body(self, out, entity):
+        if getattr(entity, '__flex_fields__', None):
+            raise TypeError('Flex fields can not be encoded')
+
+        items = entity.__values__.items()
+        _write_varint(out, len(items))
+        writers = self._writers
+        for name, value in items:
+            key, none_key, write = writers[name]
+            if value is None:
+                out += none_key
+            else:
+                out += key
+                write(out, value)
+
+    def read_body(self, buf, pos):
+        entity = self.entity()
+        values = entity.__values__
+        names = self.names
+        codecs = self._codecs
+        changes = set()
+        count, pos = _read_varint(buf, pos)
+        for i in range(count):
+            key = buf[pos]
+            if key < 0x80:
+                pos += 1
+            else:
+                key, pos = _read_varint(buf, pos)
+            index = key >> 1
+            if index >= len(names):
+                raise ValueError('Unknown field index %d' % index)
+            name = names[index]
+            if key & 1:
+                values[name] = None
+            else:
+                values[name], pos = codecs[index][1](buf, pos)
+                changes.add(name)
+
+        if entity.__track_changes__ and changes:
+            object.__setattr__(entity, '__changeset__', changes)
+        return entity, pos
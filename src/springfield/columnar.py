@@ -0,0 +1,478 @@
+"""
+A columnar file format for :class:`EntityBatch`.
+
+Each field is stored as one contiguous, 8-byte aligned section:
+
+* `IntField`, `FloatField` and `BooleanField` values are little-endian
+  64-bit integers, doubles and bytes
+* `DateTimeField` values are 64-bit microseconds since the epoch in UTC
+* `StringField` and `BytesField` values are a section of 64-bit offsets
+  into a section of UTF-8 text or bytes
+* Other values, and integers that don't fit in 64 bits, are stored like
+  text, as the JSON of :meth:`Field.jsonify`
+
+Columns with missing values have a section with a byte per row that is
+``1`` where the value is missing.
+
+:func:`pack_into` writes a batch into a buffer allocated with
+:func:`packed_size` bytes, such as shared memory.
+
+:func:`open_file` maps a file into memory, and :func:`read` reads any
+buffer, such as a `bytes` object or shared memory. Columns are views of the
+buffer rather than copies, NumPy arrays if NumPy is installed, so only the
+parts of the file that are read are loaded. Rows are only turned into
+entities when they are read::
+
+    with open('users.sfc', 'wb') as fp:
+        columnar.write(EntityBatch.from_entities(User, users), fp)
+
+    with columnar.open_file('users.sfc', User) as batch:
+        total = batch.column('age').sum()
+        user = batch[10].to_entity()
+"""
+from __future__ import absolute_import
+
+import array
+import json
+import mmap
+import struct
+import sys
+from datetime import datetime, timedelta
+
+from six import PY2
+
+from springfield import fields
+from springfield.batch import Column, EntityBatch, numpy
+from springfield.binary import fingerprint
+from springfield.timeutil import utc
+from springfield.types import Empty
+
+MAGIC = b'SFCL'
+VERSION = 1
+
+_header = struct.Struct('<4sB3xIQI')
+
+# Kinds of columns
+_INT = 'q'
+_FLOAT = 'd'
+_BOOL = '?'
+_DATETIME = 'M'
+_TEXT = 's'
+_BYTES = 'b'
+_JSON = 'j'
+
+_sizes = {_INT: 8, _FLOAT: 8, _BOOL: 1, _DATETIME: 8}
+
+# `array` codes of fixed-width kinds
+_array_codes = {_INT: 'q', _FLOAT: 'd', _BOOL: 'B', _DATETIME: 'q'}
+
+if numpy is not None:
+    _dtypes = {
+        _INT: numpy.dtype('<i8'),
+        _FLOAT: numpy.dtype('<f8'),
+        _BOOL: numpy.dtype(numpy.bool_),
+        _DATETIME: numpy.dtype('<M8[us]'),
+    }
+
+# Whether a `memoryview` of the buffer can be cast to values directly
+_cast = sys.byteorder == 'little' and not PY2
+
+_epoch = datetime(1970, 1, 1)
+
+
+def _align(size):
+    return (size + 7) & ~7
+
+
+def _kind(field):
+    if isinstance(field, fields.BooleanField):
+        return _BOOL
+    elif isinstance(field, fields.IntField):
+        return _INT
+    elif isinstance(field, fields.FloatField):
+        return _FLOAT
+    elif isinstance(field, fields.DateTimeField):
+        return _DATETIME
+    elif isinstance(field, fields.BytesField):
+        return _BYTES
+    elif isinstance(field, fields.StringField):
+        return _TEXT
+    return _JSON
+
+
+def _microseconds(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(utc).replace(tzinfo=None)
+    delta = value - _epoch
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _to_bytes(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tostring() if PY2 else values.tobytes()
+
+
+def _fixed_section(kind, column, size):
+    """
+    Pack the values of a fixed-width column.
+
+    :returns: The packed values, or ``None`` if they don't fit, and whether
+              datetimes are timezone aware
+    """
+    aware = bool(column.aware)
+    values = column.values
+    if numpy is not None and isinstance(values, numpy.ndarray) and values.dtype != object:
+        return values.astype(_dtypes[kind]).tobytes(), aware
+
+    present = [column.get(i) for i in range(size)]
+    present = [v for v in present if v is not Empty]
+    if kind == _DATETIME:
+        kinds = set(v.tzinfo is not None for v in present)
+        if len(kinds) > 1:
+            # Mixed naive and aware datetimes
+            return None, aware
+        aware = kinds == set([True])
+        convert = _microseconds
+    elif kind == _FLOAT:
+        convert = float
+    else:
+        convert = int
+
+    fill = 0.0 if kind == _FLOAT else 0
+    values = []
+    for i in range(size):
+        value = column.get(i)
+        values.append(fill if value is Empty else convert(value))
+    try:
+        return _to_bytes(array.array(_array_codes[kind], values)), aware
+    except OverflowError:
+        return None, aware
+
+
+def _variable_sections(kind, field, column, size):
+    """
+    Get the offsets and data sections of a text, bytes or JSON column.
+    """
+    pieces = []
+    offsets = array.array('q', [0])
+    end = 0
+    for i in range(size):
+        value = column.get(i)
+        if value is not Empty:
+            if kind == _TEXT:
+                value = value.encode('utf-8')
+            elif kind == _JSON:
+                value = json.dumps(field.jsonify(value)).encode('utf-8')
+            pieces.append(value)
+            end += len(value)
+        offsets.append(end)
+    return _to_bytes(offsets), b''.join(pieces)
+
+
+def _missing_section(column):
+    missing = column.missing
+    if missing is None:
+        return None
+    if numpy is not None and isinstance(missing, numpy.ndarray):
+        return missing.astype(numpy.bool_).tobytes()
+    return bytes(bytearray(1 if m else 0 for m in missing))
+
+
+def _layout(batch):
+    """
+    Get the header and the sections of a batch, in the order they are written.
+    """
+    size = len(batch)
+    sections = []
+    offset = [0]
+
+    def add(data):
+        if data is None:
+            return None
+        sections.append((offset[0], data))
+        position = offset[0]
+        offset[0] = _align(position + len(data))
+        return [position, len(data)]
+
+    directory = []
+    for name in sorted(batch.columns):
+        column = batch.columns[name]
+        field = batch.entity.__fields__[name]
+        kind = _kind(field)
+        entry = {'name': name, 'kind': kind, 'aware': False}
+
+        data = None
+        if kind in _sizes:
+            data, entry['aware'] = _fixed_section(kind, column, size)
+            if data is None:
+                kind = entry['kind'] = _JSON
+
+        if data is None:
+            offsets, data = _variable_sections(kind, field, column, size)
+            entry['offsets'] = add(offsets)
+        entry['data'] = add(data)
+        entry['missing'] = add(_missing_section(column))
+        directory.append(entry)
+
+    directory = json.dumps(directory).encode('utf-8')
+    start = _align(_header.size + len(directory))
+    header = _header.pack(MAGIC, VERSION, fingerprint(batch.entity), size, len(directory)) + directory
+    header += b'\0' * (start - len(header))
+    return header, sections
+
+
+def write(batch, fp):
+    """
+    Write an :class:`EntityBatch` to a binary file-like object.
+    """
+    header, sections = _layout(batch)
+    fp.write(header)
+    position = 0
+    for offset, data in sections:
+        fp.write(b'\0' * (offset - position))
+        fp.write(data)
+        position = offset + len(data)
+
+
+def _packed_size(header, sections):
+    if not sections:
+        return len(header)
+    offset, data = sections[-1]
+    return len(header) + offset + len(data)
+
+
+def _pack_into(buf, header, sections):
+    """
+    Copy the header and sections into a zero-filled buffer.
+    """
+    buf[:len(header)] = header
+    start = len(header)
+    for offset, data in sections:
+        buf[start + offset:start + offset + len(data)] = data
+
+
+def packed_size(batch):
+    """
+    Get the number of bytes of an :class:`EntityBatch` in the columnar format,
+    e.g. to allocate a buffer for :func:`pack_into`.
+    """
+    return _packed_size(*_layout(batch))
+
+
+def pack_into(batch, buf):
+    """
+    Write an :class:`EntityBatch` in the columnar format into a writable,
+    zero-filled buffer, such as a `bytearray` or shared memory.
+
+    :param buf: A buffer of at least :func:`packed_size` bytes
+    :returns: The number of bytes written
+    :raises ValueError: If `buf` is too small
+    """
+    header, sections = _layout(batch)
+    size = _packed_size(header, sections)
+    if len(buf) < size:
+        raise ValueError('The batch needs a buffer of %d bytes, got %d' % (size, len(buf)))
+    _pack_into(buf, header, sections)
+    return size
+
+
+def dumps(batch):
+    """
+    Get an :class:`EntityBatch` in the columnar format as `bytes`.
+    """
+    header, sections = _layout(batch)
+    out = bytearray(_packed_size(header, sections))
+    _pack_into(out, header, sections)
+    return bytes(out)
+
+
+class _DateTimeView(object):
+    """
+    Datetimes of a sequence of microseconds since the epoch.
+    """
+    def __init__(self, values, aware):
+        self.values = values
+        self.aware = aware
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _DateTimeView(self.values[index], self.aware)
+        value = _epoch + timedelta(microseconds=self.values[index])
+        if self.aware:
+            value = value.replace(tzinfo=utc)
+        return value
+
+
+class _BlobView(object):
+    """
+    Values of a text, bytes or JSON column, loaded when they are read.
+    """
+    def __init__(self, offsets, data, load):
+        self.offsets = offsets
+        self.data = data
+        self.load = load
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                # Offsets are shared with the rows before and after
+                return _BlobView(self.offsets[start:max(start, stop) + 1], self.data, self.load)
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        start = int(self.offsets[index])
+        end = int(self.offsets[index + 1])
+        return self.load(bytes(self.data[start:end]))
+
+
+def _view(buf, location, kind):
+    """
+    Get a view of a fixed-width section without copying it, if possible.
+    """
+    offset, size = location
+    if numpy is not None:
+        dtype = _dtypes[kind]
+        return numpy.frombuffer(buf, dtype=dtype, count=size // dtype.itemsize, offset=offset)
+
+    section = memoryview(buf)[offset:offset + size]
+    if _cast:
+        return section.cast(_array_codes[kind] if kind != _BOOL else '?')
+
+    values = array.array(_array_codes[kind])
+    if PY2:
+        values.fromstring(section.tobytes())
+    else:
+        values.frombytes(section)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    if kind == _BOOL:
+        values = [bool(v) for v in values]
+    return values
+
+
+def _text(value):
+    return value.decode('utf-8')
+
+
+def _json_loader(field):
+    def load(value):
+        if not value:
+            # Missing
+            return None
+        return field.adapt(json.loads(value.decode('utf-8')))
+    return load
+
+
+class ColumnarBatch(EntityBatch):
+    """
+    An :class:`EntityBatch` with columns that are views of a buffer in the
+    columnar format. Use :func:`read` or :func:`open_file` to create one.
+    """
+    def __init__(self, entity, columns, size, buffer, mapping=None):
+        super(ColumnarBatch, self).__init__(entity, columns, size)
+
+        #: The buffer the columns are views of
+        self.buffer = buffer
+        self._mapping = mapping
+
+    def close(self):
+        """
+        Release the columns and close the memory map, if any. If views of
+        the columns are still referenced, the memory map is closed once
+        they are garbage collected instead.
+        """
+        self.columns = {}
+        self.buffer = None
+        if self._mapping is not None:
+            try:
+                self._mapping.close()
+            except BufferError:
+                pass
+            self._mapping = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read(buf, entity, mapping=None):
+    """
+    Read a batch from a buffer in the columnar format without copying the
+    columns.
+
+    :param buf: `bytes`, a `memoryview`, an `mmap` or another buffer
+    :param entity: The :class:`Entity` class of the rows
+    :param mapping: An object to close with the batch, such as an `mmap`
+    :raises ValueError: If the buffer isn't in the columnar format or
+                        was written for different fields
+    :returns: A :class:`ColumnarBatch`
+    """
+    if len(buf) < _header.size:
+        raise ValueError('Not a columnar batch')
+    magic, version, print_, size, directory_size = _header.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a columnar batch')
+    if print_ != fingerprint(entity):
+        raise ValueError('Batch was written with different fields than %s' % entity.__name__)
+
+    start = _header.size
+    directory = json.loads(bytes(buf[start:start + directory_size]).decode('utf-8'))
+
+    # Sections are located relative to the end of the directory
+    base = _align(start + directory_size)
+    for entry in directory:
+        for key in ('data', 'offsets', 'missing'):
+            if entry.get(key) is not None:
+                entry[key] = (base + entry[key][0], entry[key][1])
+
+    data = memoryview(buf)
+    columns = {}
+    for entry in directory:
+        kind = entry['kind']
+        aware = entry['aware']
+        if kind in _sizes:
+            values = _view(buf, entry['data'], kind)
+            if kind == _DATETIME and numpy is None:
+                values = _DateTimeView(values, aware)
+        else:
+            offset, length = entry['data']
+            if kind == _TEXT:
+                load = _text
+            elif kind == _BYTES:
+                load = bytes
+            else:
+                load = _json_loader(entity.__fields__[entry['name']])
+            values = _BlobView(_view(buf, entry['offsets'], _INT), data[offset:offset + length], load)
+
+        missing = None
+        if entry['missing'] is not None:
+            missing = _view(buf, entry['missing'], _BOOL)
+        columns[entry['name']] = Column(values, missing, aware)
+
+    return ColumnarBatch(entity, columns, size, buf, mapping)
+
+
+def open_file(filename, entity):
+    """
+    Memory-map a file in the columnar format. Close the batch, or use it as
+    a context manager, to unmap the file.
+
+    :returns: A :class:`ColumnarBatch`
+    """
+    with open(filename, 'rb') as fp:
+        mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return read(mapping, entity, mapping)
+    except Exception:
+        mapping.close()
+        raise
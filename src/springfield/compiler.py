@@ -0,0 +1,335 @@
+"""
+Builds functions specialized for a single :class:`Entity` class.
+
+The generic :class:`Entity` code paths look up fields, descriptors and
+converters by name for every value. The functions built here resolve all
+of that once, when the :class:`Entity` class is created, so loading a
+value costs a dict lookup and a call to the field's adapter and serializing
+only touches the fields that actually need converting.
+"""
+import inspect
+import keyword
+import re
+
+from six import exec_, string_types
+
+from springfield.fields import CollectionField, EntityField, Field, FieldDescriptor, LazyValue
+from springfield.projection import _resolve
+from springfield.types import Empty
+
+
+class Namespace(dict):
+    """
+    The global names available to compiled source code.
+    """
+    def __init__(self, *args, **kwargs):
+        super(Namespace, self).__init__(*args, **kwargs)
+        self._counter = 0
+
+    def _unique(self, hint):
+        self._counter += 1
+        return '_%s_%d' % (hint, self._counter)
+
+    def add(self, obj, hint='obj'):
+        """
+        Make `obj` available to compiled source.
+
+        :param obj: Any object
+        :param hint: A readable prefix for the name
+        :returns: The name to refer to `obj` with
+        """
+        name = self._unique(hint)
+        self[name] = obj
+        return name
+
+    def var(self, hint='var'):
+        """
+        Get a unique name to use for a local variable.
+        """
+        return self._unique(hint)
+
+
+_identifier = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def attribute(obj, name):
+    """
+    Get Python source to access the `name` attribute of `obj`.
+
+    :param obj: Source for the object
+    :param name: The attribute name
+    """
+    if _is_identifier(name):
+        return '%s.%s' % (obj, name)
+    return 'getattr(%s, %r)' % (obj, name)
+
+
+def set_attribute(obj, name, value):
+    """
+    Get a Python statement that sets the `name` attribute of `obj` to `value`.
+
+    :param obj: Source for the object
+    :param name: The attribute name
+    :param value: Source for the value
+    """
+    if _is_identifier(name):
+        return '%s.%s = %s' % (obj, name, value)
+    return 'setattr(%s, %r, %s)' % (obj, name, value)
+
+
+def _is_identifier(name):
+    return bool(_identifier.match(name)) and not keyword.iskeyword(name) and not name.startswith('__')
+
+
+def compile_function(name, lines, namespace, filename):
+    """
+    Compile the source `lines` of a function definition.
+
+    :param name: The name of the function `lines` define
+    :param lines: The lines of Python source
+    :param namespace: The :class:`Namespace` to compile the function in
+    :param filename: A name to show for the source in tracebacks
+    :returns: The function
+    """
+    code = compile('\n'.join(lines) + '\n', filename, 'exec')
+    exec_(code, namespace)
+    return namespace[name]
+
+
+def _loadable_fields(cls):
+    """
+    Get a map of field names to adapters for the fields of `cls` that
+    can be loaded directly into `__values__`.
+
+    Fields that use a custom descriptor or override :meth:`Field.set`
+    are left out so they keep going through their own code.
+    """
+    adapters = {}
+    for name, field in cls.__fields__.items():
+        descriptor = cls.__dict__.get(name)
+        if type(descriptor) is not FieldDescriptor:
+            continue
+        if type(field).set is not Field.set:
+            continue
+        adapters[name] = field.adapt
+    return adapters
+
+
+def compile_loader(cls):
+    """
+    Build a loader for `cls` that adapts and stores a mapping of values
+    in one pass.
+
+    The loader has the same behavior as calling ``entity[key] = value`` for
+    each item and ignoring unknown keys. Keys that use dot notation, empty
+    values and fields that can not be loaded directly fall back to
+    :meth:`Entity.__setitem__`.
+
+    :param cls: An :class:`Entity` class
+    :returns: A function that takes an entity and a mapping of values
+    """
+    adapters = _loadable_fields(cls)
+
+    if not cls.__track_changes__:
+        def load(self, values):
+            _values = self.__values__
+            for key, value in values.items():
+                adapt = adapters.get(key)
+                if adapt is None or value is Empty:
+                    try:
+                        self[key] = value
+                    except KeyError:
+                        pass
+                else:
+                    _values[key] = adapt(value)
+
+        load.__name__ = '__load__'
+        return load
+
+    def load(self, values):
+        _values = self.__values__
+        changes = None
+        for key, value in values.items():
+            adapt = adapters.get(key)
+            if adapt is None or value is Empty:
+                try:
+                    self[key] = value
+                except KeyError:
+                    pass
+            else:
+                old_value = _values.get(key)
+                value = _values[key] = adapt(value)
+                if value != old_value:
+                    if changes is None:
+                        changes = self.__changes__
+                    changes.add(key)
+
+    load.__name__ = '__load__'
+    return load
+
+
+def get_serializer(cls, method, include=None, exclude=None):
+    """
+    Get the ``flatten`` or ``jsonify`` function of `cls` for a mask from
+    the cache of the class, compiling it if needed.
+
+    See :func:`compile_serializer` for the arguments. A single path may be
+    given as a string.
+    """
+    if isinstance(include, string_types):
+        include = (include,)
+    if isinstance(exclude, string_types):
+        exclude = (exclude,)
+    key = (method, None if include is None else frozenset(include), frozenset(exclude or ()))
+    serializer = cls.__serializers__.get(key)
+    if serializer is None:
+        serializer = cls.__serializers__[key] = compile_serializer(cls, method, key[1], key[2])
+    return serializer
+
+
+def _split_mask(paths, key):
+    """
+    Determine if `paths` has the field `key` itself and get the paths
+    it has below `key`.
+    """
+    prefix = key + '.'
+    return key in paths, frozenset(path[len(prefix):] for path in paths if path.startswith(prefix))
+
+
+_getargspec = getattr(inspect, 'getfullargspec', None) or inspect.getargspec
+
+#: Whether ``(entity class, method)`` takes `include` and `exclude` masks
+_takes_masks = {}
+
+
+def _check_masks(entity, method):
+    """
+    Raise a `TypeError` if the `method` of the :class:`Entity` class
+    `entity` does not take masks, such as for a :class:`FlexEntity`.
+    """
+    key = (entity, method)
+    takes = _takes_masks.get(key)
+    if takes is None:
+        args = _getargspec(getattr(entity, method)).args
+        takes = _takes_masks[key] = 'include' in args and 'exclude' in args
+    if not takes:
+        raise TypeError('%s.%s() does not take include and exclude masks' % (entity.__name__, method))
+
+
+def _masked(value, method, include, exclude):
+    if type(value) is LazyValue:
+        value = value.materialize()
+    _check_masks(type(value), method)
+    return getattr(value, method)(include=include, exclude=exclude)
+
+
+def _masked_items(value, method, include, exclude):
+    if type(value) is LazyValue:
+        value = value.materialize()
+    return [None if item is None else _masked(item, method, include, exclude) for item in value]
+
+
+def compile_serializer(cls, method, include=None, exclude=None):
+    """
+    Build a straight-line ``flatten`` or ``jsonify`` function for `cls`.
+
+    Values of fields whose `method` leaves them unchanged are copied as-is,
+    the rest are converted with the expression from
+    :meth:`Field.compile_serializer`.
+
+    :param cls: An :class:`Entity` class
+    :param method: Either ``'flatten'`` or ``'jsonify'``
+    :param include: Dot notation paths of the only fields to serialize, such
+                    as ``['id', 'owner.name', 'items.*.sku']``
+    :param exclude: Dot notation paths of fields to leave out
+    :returns: A function that takes an entity and returns a `dict`
+    :raises KeyError: If a field along a path does not exist
+    """
+    if include is not None or exclude:
+        return _compile_masked_serializer(cls, method, include, frozenset(exclude or ()))
+
+    namespace = Namespace(Empty=Empty)
+    name = '__%s__' % method
+    lines = [
+        'def %s(self):' % name,
+        '    data = self.__values__.copy()',
+    ]
+    for key, field in sorted(cls.__fields__.items()):
+        if not isinstance(field, Field):
+            continue
+        expr = field.compile_serializer(method, 'value', namespace)
+        if expr is None:
+            continue
+        lines.extend([
+            '    value = data.get(%r, Empty)' % key,
+            '    if value is not Empty:',
+            '        data[%r] = %s' % (key, expr),
+        ])
+    lines.append('    return data')
+
+    return compile_function(name, lines, namespace, '<springfield %s.%s>' % (cls.__name__, method))
+
+
+def _compile_masked_serializer(cls, method, include, exclude):
+    """
+    Build a serializer that only visits the fields in the mask. Nested
+    masks are passed to the nested entities' own serializers.
+    """
+    for target in (include or frozenset()) | exclude:
+        _resolve(cls, target)
+
+    namespace = Namespace(Empty=Empty, masked=_masked, masked_items=_masked_items)
+    name = '__%s__' % method
+    lines = [
+        'def %s(self):' % name,
+        '    values = self.__values__',
+        '    data = {}',
+    ]
+    for key, field in sorted(cls.__fields__.items()):
+        if not isinstance(field, Field):
+            continue
+
+        sub_include = None
+        if include is not None:
+            whole, sub_include = _split_mask(include, key)
+            if whole:
+                sub_include = None
+            elif not sub_include:
+                continue
+
+        whole, sub_exclude = _split_mask(exclude, key)
+        if whole:
+            continue
+
+        helper = 'masked'
+        nested = field
+        if (sub_include is not None or sub_exclude) and isinstance(field, CollectionField):
+            # Paths below a collection start with `*`
+            helper = 'masked_items'
+            nested = field.field
+            if sub_include is not None:
+                whole, sub_include = _split_mask(sub_include, '*')
+                if whole:
+                    sub_include = None
+            whole, sub_exclude = _split_mask(sub_exclude, '*')
+            if whole:
+                continue
+
+        if sub_include is None and not sub_exclude:
+            # The whole value, or every whole item of a collection
+            expr = field.compile_serializer(method, 'value', namespace) or 'value'
+        else:
+            if not isinstance(nested, EntityField):
+                raise KeyError('Expected EntityField for masks below %s' % key)
+            _check_masks(nested.type, method)
+            expr = '(None if value is None else %s(value, %r, %s, %s))' % (
+                helper, method, namespace.add(sub_include, 'include'), namespace.add(sub_exclude, 'exclude'))
+
+        lines.extend([
+            '    value = values.get(%r, Empty)' % key,
+            '    if value is not Empty:',
+            '        data[%r] = %s' % (key, expr),
+        ])
+    lines.append('    return data')
+
+    return compile_function(name, lines, namespace, '<springfield %s.%s masked>' % (cls.__name__, method))
@@ -0,0 +1,172 @@
+"""
+Load entities from CSV files.
+
+The header row is read once and compiled into a loader that takes the
+positional rows of `csv.reader`, so there is no `dict` per row and dot
+notation headers like ``child.pos.top`` are only resolved once::
+
+    from springfield import csv
+
+    with open('users.csv') as fp:
+        for user in csv.read(fp, User):
+            ...
+"""
+from __future__ import absolute_import
+
+import csv
+
+from springfield.compiler import Namespace, _loadable_fields, compile_function, set_attribute
+from springfield.path import get_path
+
+
+def _column_statements(entity, header, adapters, shared, track_changes, namespace):
+    """
+    Get the source lines that set the field for a column from ``value``,
+    or ``None`` if `header` isn't a field.
+    """
+    if '.' in header:
+        try:
+            path = get_path(entity, header)
+        except KeyError:
+            return None
+        if path.wildcard:
+            # Wildcard paths can't be set
+            return None
+        return ['%s(entity, value)' % namespace.add(path.set, 'set')]
+
+    if header in adapters and header not in shared:
+        # Store the adapted value directly
+        lines = ['value = values[%r] = %s(value)' % (header, namespace.add(adapters[header], 'adapt'))]
+        if track_changes:
+            lines.extend([
+                'if value is not None:',
+                '    changes.add(%r)' % header,
+            ])
+        return lines
+
+    if header in entity.__fields__ or header in entity.__aliases__:
+        return [set_attribute('entity', header, 'value')]
+
+    return None
+
+
+def _is_known(entity, header):
+    if '.' in header:
+        try:
+            return not get_path(entity, header).wildcard
+        except KeyError:
+            return False
+    return header in entity.__fields__ or header in entity.__aliases__
+
+
+def _constructor_row_loader(entity, headers, skip_empty):
+    """
+    Build a function that creates an entity from a row through its
+    constructor, for classes that aren't compiled.
+    """
+    headers = list(headers)
+
+    def load(row):
+        if skip_empty:
+            return entity(**dict((header, value) for header, value in zip(headers, row) if value != ''))
+        return entity(**dict(zip(headers, row)))
+    return load
+
+
+def compile_row_loader(entity, headers, ignore_unknown=True, skip_empty=False):
+    """
+    Build a function that creates an entity from a row of values.
+
+    Loading a row has the same result as ``entity(**dict(zip(headers, row)))``,
+    so columns missing from the end of a short row are left unset. Classes that have
+    no compiled loader, such as those that set ``__compiled__ = False``,
+    override :meth:`Entity.__setattr__` or are a :class:`FlexEntity`, load
+    rows through their constructor.
+
+    :param entity: An :class:`Entity` class
+    :param headers: The field name or dot notation path of each column
+    :param ignore_unknown: Ignore columns that aren't fields of `entity`.
+                           If ``False``, a `KeyError` is raised for them.
+    :param skip_empty: Leave fields unset for empty strings
+    :returns: A function that takes a row and returns an entity
+    """
+    headers = list(headers)
+    if entity.__load__ is None:
+        # Flex entities take any column
+        if not ignore_unknown and not hasattr(entity, '__flex_fields__'):
+            for header in headers:
+                if not _is_known(entity, header):
+                    raise KeyError(header)
+        return _constructor_row_loader(entity, headers, skip_empty)
+
+    adapters = _loadable_fields(entity)
+    track_changes = entity.__track_changes__
+
+    # Fields that more than one column sets go through the entity
+    # to keep its change tracking correct.
+    roots = [header.split('.', 1)[0].rstrip('?') for header in headers]
+    shared = set(root for root in roots if roots.count(root) > 1)
+
+    short_loaders = {}
+
+    def load_short(row):
+        # Short rows load with a loader for the columns they have
+        load = short_loaders.get(len(row))
+        if load is None:
+            load = short_loaders[len(row)] = compile_row_loader(
+                entity, headers[:len(row)], ignore_unknown=ignore_unknown, skip_empty=skip_empty)
+        return load(row)
+
+    namespace = Namespace(new=entity, load_short=load_short)
+    lines = [
+        'def load(row):',
+        '    if len(row) < %d:' % len(headers),
+        '        return load_short(row)',
+        '    entity = new()',
+        '    values = entity.__values__',
+    ]
+    if track_changes:
+        lines.append('    changes = entity.__changes__')
+
+    for i, header in enumerate(headers):
+        statements = _column_statements(entity, header, adapters, shared, track_changes, namespace)
+        if statements is None:
+            if not ignore_unknown:
+                raise KeyError(header)
+            continue
+
+        lines.append('    value = row[%d]' % i)
+        indent = '    '
+        if skip_empty:
+            lines.append('    if value != "":')
+            indent = '        '
+        lines.extend(indent + line for line in statements)
+
+    lines.append('    return entity')
+    return compile_function('load', lines, namespace, '<springfield csv %s>' % entity.__name__)
+
+
+def read(fp, entity, headers=None, ignore_unknown=True, skip_empty=False, **kwargs):
+    """
+    Read entities from CSV.
+
+    :param fp: A file-like object to read CSV from
+    :param entity: An :class:`Entity` class
+    :param headers: The field name or dot notation path of each column.
+                    The first row is used if ``None``.
+    :param ignore_unknown: Ignore columns that aren't fields of `entity`
+    :param skip_empty: Leave fields unset for empty strings
+    :param kwargs: Arguments for `csv.reader`, such as `delimiter`
+    :returns: A generator of entities
+    """
+    reader = csv.reader(fp, **kwargs)
+    if headers is None:
+        try:
+            headers = next(reader)
+        except StopIteration:
+            return
+
+    load = compile_row_loader(entity, headers, ignore_unknown=ignore_unknown, skip_empty=skip_empty)
+    for row in reader:
+        if row:
+            yield load(row)
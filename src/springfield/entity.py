@@ -1,13 +1,126 @@
+import collections
+import itertools
 import json
 import inspect
-from six import integer_types, string_types, text_type, with_metaclass
-from springfield.fields import Field, Empty
+from six import integer_types, raise_from, string_types, text_type, with_metaclass
+from springfield.fields import AdaptManyError, Field, Empty
 from springfield.alias import Alias
-from springfield import fields
+from springfield import fields, jsonstream
+from springfield.binary import get_codec
+from springfield.compiler import compile_loader, compile_serializer, get_serializer
+from springfield.path import get_path
+from springfield.projection import get_projection
+from springfield.values import CompactValues
 from anticipate.adapt import adapt, AdaptError
 from anticipate import adapter
 
 
+def _unpickle(cls, fingerprint, values, changes=None, sparse=False):
+    """
+    Create an entity from the positional values of :meth:`Entity.__reduce_ex__`.
+
+    :param fingerprint: The :func:`springfield.binary.fingerprint` of the
+                        class when it was pickled
+    :param changes: The changed field names, or ``True`` if every value changed
+    :param sparse: Whether `values` has :data:`Empty` gaps for missing values
+    :raises ValueError: If the fields of the class have changed since it was pickled
+    """
+    if fingerprint != get_codec(cls).fingerprint:
+        # Values would be loaded into the wrong fields
+        raise ValueError('%s was pickled with different fields' % cls.__name__)
+    if sparse:
+        values = dict((name, value) for name, value in zip(cls.__field_order__, values) if value is not Empty)
+    else:
+        values = dict(zip(cls.__field_order__, values))
+    if changes is True:
+        changes = set(values)
+    _wrap_lazy(cls, values)
+    if cls.__values_class__ is not dict:
+        values = cls.__values_class__(values)
+    entity = cls.__new__(cls)
+    object.__setattr__(entity, '__values__', values)
+    object.__setattr__(entity, '__changeset__', changes)
+    return entity
+
+
+def _unwrap_lazy(values):
+    """
+    Replace each :class:`springfield.fields.LazyValue` in a list of values
+    with its raw value, so pickles don't include the field.
+    """
+    for i, value in enumerate(values):
+        if type(value) is fields.LazyValue:
+            values[i] = value.raw
+    return values
+
+
+def _wrap_lazy(cls, values):
+    """
+    Adapt the raw values of lazy fields in a `dict` of pickled values, so
+    they're wrapped by the class's own fields.
+    """
+    for name in cls.__lazy__:
+        value = values.get(name)
+        if isinstance(value, (dict, list, tuple)):
+            values[name] = cls.__fields__[name].adapt(value)
+
+
+#: The errors of adapting an item that :meth:`Entity.adapt_all` reports by index
+_adapt_errors = (AdaptError, OverflowError, TypeError, ValueError)
+
+
+def _adapt_chunk(cls, start, items):
+    """
+    Adapt a chunk of :meth:`Entity.adapt_all` in a worker.
+
+    :param start: The index of the first item, to report errors with
+    :raises AdaptManyError: If any item could not be adapted
+    """
+    result = []
+    errors = []
+    for index, item in enumerate(items, start):
+        try:
+            result.append(adapt(item, cls))
+        except _adapt_errors as e:
+            errors.append((index, e))
+    if errors:
+        raise AdaptManyError(errors)
+    return result
+
+
+def _adapt_serial(cls, obj):
+    for index, item in enumerate(obj):
+        try:
+            entity = adapt(item, cls)
+        except _adapt_errors as e:
+            raise_from(AdaptManyError([(index, e)]), e)
+        yield entity
+
+
+def _adapt_parallel(cls, obj, executor, chunk_size, max_pending):
+    items = iter(obj)
+    pending = collections.deque()
+    start = 0
+    try:
+        while True:
+            chunk = list(itertools.islice(items, chunk_size))
+            if not chunk:
+                break
+            pending.append(executor.submit(_adapt_chunk, cls, start, chunk))
+            start += len(chunk)
+            if len(pending) >= max_pending:
+                for item in pending.popleft().result():
+                    yield item
+
+        while pending:
+            for item in pending.popleft().result():
+                yield item
+    finally:
+        # Stop chunks that won't be read when closed early or on errors
+        for future in pending:
+            future.cancel()
+
+
 class EntityBase(object):
     """
     An empty class that does nothing but allow us to determine
@@ -17,6 +130,7 @@ class EntityBase(object):
     until EntityMetaClass is created but EntityMetaClass can't compare
     against Entity since it doesn't exist yet.
     """
+    __slots__ = ()
 
 
 class EntityMetaClass(type):
@@ -27,7 +141,7 @@ class EntityMetaClass(type):
             if hasattr(base, '__fields__'):
                 _fields.update(base.__fields__)
             if hasattr(base, '__aliases__'):
-                _fields.update(base.__aliases__)
+                aliases.update(base.__aliases__)
 
         for key, val in list(attrs.items()):
             is_cls = inspect.isclass(val)
@@ -57,6 +171,11 @@ class EntityMetaClass(type):
                     # a collection of that Field
                     _fields[key] = fields.CollectionField(attr)
 
+        compact = attrs.get('__compact__', any(getattr(b, '__compact__', False) for b in bases))
+        if compact:
+            # Leave out the instance `__dict__`, values are kept in `__values__`
+            attrs.setdefault('__slots__', ())
+
         for key, field in _fields.items():
             attrs[key] = field.make_descriptor(key)
 
@@ -65,37 +184,133 @@ class EntityMetaClass(type):
 
         attrs['__fields__'] = _fields
         attrs['__aliases__'] = aliases
+        attrs['__paths__'] = {}
+        attrs['__projections__'] = {}
+        attrs['__serializers__'] = {}
+        attrs['__codec__'] = None
+        attrs['__field_order__'] = tuple(sorted(_fields))
+        attrs['__lazy__'] = tuple(key for key, field in _fields.items() if field.lazy)
 
         new_class = super(EntityMetaClass, mcs).__new__(mcs, name, bases, attrs)
 
+        if compact:
+            if hasattr(new_class, '__flex_fields__'):
+                raise TypeError('Compact entity %s can not have flex fields.' % name)
+            new_class.__values_class__ = CompactValues.for_fields('%sValues' % name, _fields)
+
         for key, field in _fields.items():
             field.init(new_class)
 
         for key, field in aliases.items():
             field.init(new_class)
 
+        if new_class.__compiled__ and not mcs._overrides_item_access(new_class):
+            new_class.__load__ = compile_loader(new_class)
+            new_class.__flatten__ = compile_serializer(new_class, 'flatten')
+            new_class.__jsonify__ = compile_serializer(new_class, 'jsonify')
+        else:
+            new_class.__load__ = None
+            new_class.__flatten__ = None
+            new_class.__jsonify__ = None
+
         return new_class
 
+    @classmethod
+    def _overrides_item_access(mcs, cls):
+        """
+        Determine if `cls`, or one of its bases, changes how values are
+        assigned, in which case a compiled loader would bypass that behavior.
+        """
+        entity_classes = [c for c in cls.__mro__ if isinstance(c, mcs)]
+        # The last class is the root `Entity` which defines the standard behavior
+        for c in entity_classes[:-1]:
+            if '__setattr__' in c.__dict__ or '__setitem__' in c.__dict__:
+                return True
+        return False
+
 
 class Entity(with_metaclass(EntityMetaClass, EntityBase)):
-    __values__ = None
-    __changes__ = None
+    __slots__ = ('__values__', '__changeset__')
     __fields__ = None
     __aliases__ = None
 
+    #: Compiled dot notation paths, see :meth:`path`
+    __paths__ = None
+
+    #: Compiled projections, see :meth:`projection`
+    __projections__ = None
+
+    #: Compiled serializers for masks, see :meth:`jsonify`
+    __serializers__ = None
+
+    #: The field names in a stable order, used for positional pickles and
+    #: the field indexes of :mod:`springfield.binary`
+    __field_order__ = ()
+
+    #: The binary codec, created when first needed, see :meth:`to_bytes`
+    __codec__ = None
+
+    #: The names of lazy fields, see :class:`springfield.fields.LazyValue`
+    __lazy__ = ()
+
+    #: Generate a specialized loader for this class when it is created.
+    #: Set to ``False`` to always load values through :meth:`__setitem__`.
+    __compiled__ = True
+
+    #: The compiled loader and serializers, or ``None`` if the class is not compiled
+    __load__ = None
+    __flatten__ = None
+    __jsonify__ = None
+
+    #: Keep values in a :class:`CompactValues` list instead of a `dict`
+    #: and leave out the instance `__dict__`. See :class:`CompactEntity`.
+    __compact__ = False
+
+    #: The mapping type values are kept in
+    __values_class__ = dict
+
+    #: Record which fields change in :attr:`__changes__`. Set to ``False``
+    #: to skip comparing old and new values on every assignment.
+    __track_changes__ = True
+
     def __init__(self, **values):
         # Where the actual values are stored
-        object.__setattr__(self, '__values__', {})
+        object.__setattr__(self, '__values__', self.__values_class__())
 
-        # List of field names that have changed
-        object.__setattr__(self, '__changes__', set([]))
+        # Set of field names that have changed, created when first needed
+        object.__setattr__(self, '__changeset__', None)
 
         self.update(values)
 
-    def flatten(self):
+    @property
+    def __changes__(self):
+        """
+        The set of field names that have changed.
+        """
+        changes = self.__changeset__
+        if changes is None:
+            changes = set([])
+            object.__setattr__(self, '__changeset__', changes)
+        return changes
+
+    @__changes__.setter
+    def __changes__(self, changes):
+        object.__setattr__(self, '__changeset__', changes)
+
+    def flatten(self, include=None, exclude=None):
         """
         Get the values as basic Python types
+
+        :param include: Dot notation paths of the only fields to include.
+                        See :meth:`jsonify`.
+        :param exclude: Dot notation paths of fields to leave out
         """
+        if include is not None or exclude:
+            return get_serializer(type(self), 'flatten', include, exclude)(self)
+
+        if self.__flatten__ is not None:
+            return self.__flatten__()
+
         data = {}
         for key, val in self.__values__.items():
             val = self.__fields__[key].flatten(val)
@@ -103,10 +318,28 @@ class Entity(with_metaclass(EntityMetaClass, EntityBase)):
 
         return data
 
-    def jsonify(self):
+    def jsonify(self, include=None, exclude=None):
         """
         Return a dictionary suitable for JSON encoding.
+
+        Masks are compiled into a serializer that only visits the fields
+        in the mask and are cached per class::
+
+            user.jsonify(include=['id', 'owner.name', 'items.*.sku'])
+            user.jsonify(exclude=['owner.email'])
+
+        :param include: Dot notation paths of the only fields to include,
+                        or a single path. ``*`` includes every item of a
+                        collection.
+        :param exclude: Dot notation paths of fields to leave out
+        :raises KeyError: If a field along a path does not exist
         """
+        if include is not None or exclude:
+            return get_serializer(type(self), 'jsonify', include, exclude)(self)
+
+        if self.__jsonify__ is not None:
+            return self.__jsonify__()
+
         data = {}
         for key, val in self.__values__.items():
             val = self.__fields__[key].jsonify(val)
@@ -119,9 +352,77 @@ class Entity(with_metaclass(EntityMetaClass, EntityBase)):
         """
         return json.dumps(self.jsonify())
 
+    def dump_json(self, fp, **kwargs):
+        """
+        Write the entity as JSON to a file-like object without building
+        the intermediate `dict` from :meth:`jsonify`.
+
+        See :func:`springfield.jsonstream.dump_json` for the arguments.
+        """
+        jsonstream.dump_json(self, fp, **kwargs)
+
+    @classmethod
+    def from_json(cls, data, only=None):
+        """
+        Create an entity from a JSON string.
+
+        :param only: Only load these fields. See :meth:`projection`.
+        """
+        data = json.loads(data)
+        if only is not None:
+            return get_projection(cls, only).load(data)
+        return cls(**data)
+
+    def to_bytes(self):
+        """
+        Encode the entity in the compact binary format of
+        :mod:`springfield.binary`.
+
+        :returns: `bytes`
+        """
+        return get_codec(type(self)).encode(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Create an entity from the output of :meth:`to_bytes`.
+
+        :param data: `bytes`, a `bytearray` or a `memoryview`
+        :raises ValueError: If `data` was encoded for different fields
+        """
+        return get_codec(cls).decode(data)
+
+    @classmethod
+    def from_csv(cls, fp, **kwargs):
+        """
+        Read entities from CSV. Headers can use dot notation.
+
+        See :func:`springfield.csv.read` for the arguments.
+
+        :returns: A generator of entities
+        """
+        from springfield import csv
+        return csv.read(fp, cls, **kwargs)
+
     @classmethod
-    def from_json(cls, data):
-        return cls(**json.loads(data))
+    def iter_json(cls, fp, path=None, only=None, **kwargs):
+        """
+        Incrementally read a JSON array of entities from a file-like object.
+
+        Only one element of the array is kept in memory at a time.
+        See :func:`springfield.jsonstream.iter_items` for the arguments.
+
+        :param only: Only load these fields. See :meth:`projection`.
+        :returns: A generator of entities
+        """
+        items = jsonstream.iter_items(fp, path, **kwargs)
+        if only is None:
+            for data in items:
+                yield cls(**data)
+        else:
+            load = get_projection(cls, only).load
+            for data in items:
+                yield load(data)
 
     def set(self, key, value):
         self.__setattr__(key, value)
@@ -135,6 +436,7 @@ class Entity(with_metaclass(EntityMetaClass, EntityBase)):
         if isinstance(key, string_types):
             return getattr(self, key, default)
         else:
+            self.materialize()
             d = {}
             for k in key:
                 if empty:
@@ -145,17 +447,24 @@ class Entity(with_metaclass(EntityMetaClass, EntityBase)):
                         d[k] = v
             return d
 
+    def materialize(self):
+        """
+        Adapt the raw values of lazy fields that haven't been read yet.
+        """
+        for name in self.__lazy__:
+            if type(self.__values__.get(name)) is fields.LazyValue:
+                getattr(self, name)
+
     def update(self, values):
         """
         Update attibutes. Ignore keys that aren't fields.
         Allows dot notation.
         """
         if hasattr(values, '__values__'):
-            for key, val in values.__values__.items():
-                try:
-                    self[key] = val
-                except KeyError:
-                    pass
+            values = values.__values__
+
+        if self.__load__ is not None:
+            self.__load__(values)
         else:
             for key, val in values.items():
                 try:
@@ -163,44 +472,35 @@ class Entity(with_metaclass(EntityMetaClass, EntityBase)):
                 except KeyError:
                     pass
 
-    def _get_field_path(self, entity, target, path=None):
+    @classmethod
+    def path(cls, target):
         """
-        Use dot notation to get a field and all it's
-        ancestory fields.
+        Get a compiled :class:`springfield.path.FieldPath` for a dot notation
+        `target` such as ``'child?.pos.top'``. Paths are cached per class.
+
+        :raises KeyError: If a field along the path does not exist
         """
-        path = path or []
-        if '.' in target:
-            name, right = target.split('.', 1)
-            soak = False
-            if name.endswith('?'):
-                # Targets like 'child?.key' use "soak" to allow `child` to be empty
-                name = name[:-1]
-                soak = True
+        return get_path(cls, target)
 
-            field = entity.__fields__[name]
-            key = '.'.join([f[0] for f in path] + [name])
+    @classmethod
+    def projection(cls, only):
+        """
+        Get a compiled :class:`springfield.projection.Projection` that only
+        loads the fields in `only`, such as ``['id', 'owner.name', 'items.*.sku']``.
+        Fields outside the projection are not adapted or stored. Projections
+        are cached per class::
 
-            if isinstance(field, fields.EntityField):
-                path.append((key, name, field, soak))
-                return self._get_field_path(field.type, right, path)
-            else:
-                raise KeyError('Expected EntityField for %s' % key)
-        else:
-            soak = False
-            if target.endswith('?'):
-                # Targets like 'child?.key' use "soak" to allow `child` to be empty
-                target = target[:-1]
-                soak = True
+            user = User.projection(['id', 'owner.name']).load(data)
 
-            key = '.'.join([f[0] for f in path] + [target])
-            path.append((key, target, entity.__fields__[target], soak))
-            return path
+        :raises KeyError: If a field along a path does not exist
+        """
+        return get_projection(cls, only)
 
     def __setattr__(self, name, value):
         """
         Don't allow setting attributes that haven't been defined as fields.
         """
-        if name in self.__fields__:
+        if name in self.__fields__ or name in self.__aliases__:
             object.__setattr__(self, name, value)
         else:
             raise AttributeError('Field %r not defined.' % name)
@@ -209,23 +509,7 @@ class Entity(with_metaclass(EntityMetaClass, EntityBase)):
     def __getitem__(self, name):
         try:
             if '.' in name:
-                pos = self
-                path = self._get_field_path(self, name)
-                last = path[-1]
-                path = path[:-1]
-                for field_key, field_name, field, soak in path:
-                    if isinstance(field, fields.EntityField):
-                        if not getattr(pos, field_name):
-                            if soak:
-                                return Empty
-                            else:
-                                raise ValueError('%s is empty' % field_key)
-                        pos = getattr(pos, field_name)
-                    else:
-                        raise ValueError('Expected Entity for %s' % field_key)
-
-                # This should be the end of our path, just get it
-                return getattr(pos, last[1])
+                return get_path(type(self), name).get(self)
 
             return getattr(self, name)
         except AttributeError:
@@ -235,22 +519,7 @@ class Entity(with_metaclass(EntityMetaClass, EntityBase)):
     def __setitem__(self, name, value):
         try:
             if '.' in name:
-                pos = self
-                path = self._get_field_path(self, name)
-                last = path[-1]
-                path = path[:-1]
-
-                for field_key, field_name, field, soak in path:
-                    if isinstance(field, fields.EntityField):
-                        if not getattr(pos, field_name):
-                            # Create a new Entity instance
-                            setattr(pos, field_name, field.type())
-                        pos = getattr(pos, field_name)
-                    else:
-                        raise ValueError('Expected Entity for %s' % field_key)
-
-                # This should be the end of our path, just set it
-                return setattr(pos, last[1], value)
+                return get_path(type(self), name).set(self, value)
 
             return setattr(self, name, value)
         except AttributeError:
@@ -270,9 +539,11 @@ class Entity(with_metaclass(EntityMetaClass, EntityBase)):
         return len(self.__values__)
 
     def iteritems(self):
+        self.materialize()
         return self.__values__.items()
 
     def items(self):
+        self.materialize()
         return self.__values__.items()
 
     def clear(self):
@@ -286,27 +557,91 @@ class Entity(with_metaclass(EntityMetaClass, EntityBase)):
         return adapt(obj, cls)
 
     @classmethod
-    def adapt_all(cls, obj):
-        return (adapt(i, cls) for i in obj)
+    def adapt_all(cls, obj, executor=None, chunksize=1000, max_pending=8, chunk_size=None):
+        """
+        Adapt each item of an iterable to this class.
+
+        With an `executor`, chunks of items are adapted by its workers while
+        earlier results are read. A `ProcessPoolExecutor` uses more than one
+        core, and a `ThreadPoolExecutor` does on free-threaded builds of Python.
+
+        :param executor: An optional `concurrent.futures.Executor` to adapt
+                         chunks of items with. The class and the items must
+                         be picklable for a `ProcessPoolExecutor`.
+        :param chunksize: The number of items to send to a worker at a time,
+                          like `Executor.map`
+        :param max_pending: The most chunks to have submitted to the executor
+                            at a time
+        :param chunk_size: An alias of `chunksize`
+        :raises AdaptManyError: With the index of each item that could not
+                                be adapted. Without an `executor`, it is
+                                raised for the first such item.
+        :returns: A generator of entities in the order of the items
+        """
+        if executor is None:
+            return _adapt_serial(cls, obj)
+        if chunk_size is not None:
+            chunksize = chunk_size
+        return _adapt_parallel(cls, obj, executor, chunksize, max_pending)
 
     def __repr__(self):
         return u'<%s %s>' % (self.__class__.__name__, json.dumps(dict(((k, text_type(v)) for k, v in self.__values__.items()))).replace('"', ''))
 
+    def __reduce_ex__(self, protocol):
+        """
+        Pickle as the class and a tuple of values in :attr:`__field_order__`,
+        which is smaller and faster to load than a `dict` of values.
+        Changes are only included if there are any. A fingerprint of the
+        fields is included so pickles of a class whose fields have since
+        changed raise a `ValueError` instead of loading values into the
+        wrong fields.
+        """
+        present = self.__values__
+        get = present.get
+        values = [get(name, Empty) for name in self.__field_order__]
+        if self.__lazy__:
+            _unwrap_lazy(values)
+        while values and values[-1] is Empty:
+            values.pop()
+        args = (self.__class__, get_codec(self.__class__).fingerprint, tuple(values))
+
+        changes = self.__changeset__
+        if changes:
+            if len(changes) == len(present) and changes.issuperset(present):
+                changes = True
+            args += (changes,)
+        if len(values) != len(present):
+            args += (None,) * (4 - len(args)) + (True,)
+        return _unpickle, args
+
     def __getstate__(self):
         """Pickle state"""
+        values = self.__values__
+        if self.__lazy__:
+            values = dict(zip(values.keys(), _unwrap_lazy(list(values.values()))))
         return {
-            '__values__' : self.__values__,
+            '__values__' : values,
             '__changes__': self.__changes__
         }
 
     def __setstate__(self, data):
         """Restore Pickle state"""
-        object.__setattr__(self, '__values__', data['__values__'])
-        object.__setattr__(self, '__changes__', data['__changes__'])
+        values = data['__values__']
+        if self.__lazy__:
+            values = dict(values)
+            _wrap_lazy(self.__class__, values)
+        if type(values) is not self.__values_class__:
+            values = self.__values_class__(values)
+        object.__setattr__(self, '__values__', values)
+        object.__setattr__(self, '__changeset__', data['__changes__'])
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and \
-            self.__values__ == other.__values__
+        if not isinstance(other, self.__class__):
+            return False
+        if self.__lazy__:
+            self.materialize()
+            other.materialize()
+        return self.__values__ == other.__values__
 
     def __hash__(self):
         return id(self)
@@ -326,13 +661,18 @@ class FlexEntity(Entity):
 
         super(FlexEntity, self).__init__(**values)
 
+    def __reduce_ex__(self, protocol):
+        # Flex values have no position, so pickle the `dict` from `__getstate__`
+        return object.__reduce_ex__(self, protocol)
+
     def __setattr__(self, name, value):
-        if name in self.__fields__:
+        if name in self.__fields__ or name in self.__aliases__:
             object.__setattr__(self, name, value)
         else:
             self.__values__[name] = value
             self.__flex_fields__.add(name)
-            self.__changes__.add(name)
+            if self.__track_changes__:
+                self.__changes__.add(name)
 
     def __getattr__(self, name, default=None):
         return self.__values__.get(name, default)
@@ -419,6 +759,21 @@ class FlexEntity(Entity):
 
         return data
 
+class CompactEntity(Entity):
+    """
+    An Entity that uses less memory per instance.
+
+    Values are kept in a fixed-length :class:`springfield.values.CompactValues`
+    list with a position for each field, and instances have no `__dict__`.
+    Compact entities can't have flex fields or attributes other than fields.
+
+    An entity with a few fields uses about a quarter less memory, or
+    closer to half with ``__track_changes__ = False`` since the
+    `__changes__` set is often most of the remaining size.
+    """
+    __compact__ = True
+
+
 @adapter((Entity, dict), Entity)
 def to_entity(obj, to_cls):
     e = to_cls()
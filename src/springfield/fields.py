@@ -3,6 +3,7 @@ import re
 import sys
 import unicodedata
 
+from collections import OrderedDict
 from codecs import decode, encode
 from datetime import datetime
 
@@ -11,10 +12,203 @@ from six import integer_types, raise_from, string_types, text_type
 from six import reraise as raise_
 from six.moves.urllib.parse import urlparse, urlunparse
 
-from springfield.timeutil import date_parse, generate_rfc3339
+from springfield.timeutil import _lenient_parse, date_parse, generate_rfc3339
 from springfield.types import Empty
 from decimal import Decimal
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#: The kinds of NumPy arrays of strings that string conversions apply to,
+#: which only includes `bytes` if it's one of the `string_types`
+_string_kinds = 'US' if isinstance(b'', string_types) else 'U'
+
+
+class AdaptManyError(TypeError, ValueError):
+    """
+    Raised by :meth:`Field.adapt_many` when values could not be adapted.
+
+    It is both a `TypeError` and a `ValueError` since adapting a single
+    value may raise either.
+    """
+    def __init__(self, errors):
+        #: `(index, exception)` for each value that could not be adapted
+        self.errors = errors
+        super(AdaptManyError, self).__init__(
+            'Could not adapt values at indices %s: %s' % (', '.join(str(i) for i in self.indices), errors[0][1]))
+
+    @property
+    def indices(self):
+        return [index for index, error in self.errors]
+
+    def __reduce__(self):
+        # Keep the errors when sent back from a process pool worker
+        return (AdaptManyError, (self.errors,))
+
+
+#: The `cache_size` of fields that are :attr:`Field.cacheable` when it is not
+#: given. Set it before defining entities to cache adapted values by default.
+DEFAULT_CACHE_SIZE = 0
+
+
+class AdaptCache(object):
+    """
+    A bounded least recently used cache of adapted values for a :class:`Field`.
+
+    Only text values are cached, and exceptions are not cached.
+    """
+    def __init__(self, size):
+        #: The most values to keep
+        self.size = size
+
+        #: The number of values that were found in the cache
+        self.hits = 0
+
+        #: The number of values that had to be adapted
+        self.misses = 0
+
+        self._values = OrderedDict()
+
+    def __reduce__(self):
+        # Cached values aren't pickled
+        return (AdaptCache, (self.size,))
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def hit_rate(self):
+        """
+        The fraction of values found in the cache.
+        """
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def clear(self):
+        """
+        Remove all values and reset the statistics.
+        """
+        self._values.clear()
+        self.hits = self.misses = 0
+
+    def wrap(self, adapt):
+        """
+        Get a function that caches the results of `adapt`.
+        """
+        values = self._values
+
+        def adapt_cached(value):
+            if type(value) is not text_type:
+                return adapt(value)
+
+            try:
+                result = values[value]
+            except KeyError:
+                pass
+            else:
+                self.hits += 1
+                try:
+                    values.move_to_end(value)
+                except (AttributeError, KeyError):
+                    # Python 2, or removed by another thread
+                    pass
+                return result
+
+            self.misses += 1
+            result = values[value] = adapt(value)
+            while len(values) > self.size:
+                try:
+                    values.popitem(last=False)
+                except KeyError:
+                    break
+            return result
+        return adapt_cached
+
+
+class LazyValue(object):
+    """
+    The raw value of a lazy :class:`EntityField` or :class:`CollectionField`,
+    which is adapted when the field is first read.
+    """
+    __slots__ = ('field', 'raw')
+
+    def __init__(self, field, raw):
+        self.field = field
+        self.raw = raw
+
+    def materialize(self):
+        """
+        Adapt the raw value.
+        """
+        return self.field._adapt_now(self.raw)
+
+    def __eq__(self, other):
+        if type(other) is LazyValue:
+            return self.raw == other.raw
+        return NotImplemented
+
+    def __ne__(self, other):
+        if type(other) is LazyValue:
+            return self.raw != other.raw
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'LazyValue(%r)' % (self.raw,)
+
+    def __reduce__(self):
+        return (LazyValue, (self.field, self.raw))
+
+
+class StreamValue(object):
+    """
+    The value of a streaming :class:`CollectionField` given an iterator.
+
+    Items are adapted as they are read from the iterator, so the whole
+    sequence is never in memory. It can only be iterated once, a
+    `ValueError` is raised if it is iterated again.
+    """
+    def __init__(self, field, items):
+        """
+        :param field: The :class:`Field` of the items
+        :param items: An iterator of items to adapt
+        """
+        self.field = field
+        self._items = items
+
+        #: Whether the stream has been iterated
+        self.consumed = False
+
+    def __iter__(self):
+        if self.consumed:
+            raise ValueError('A streaming collection can only be iterated once')
+        self.consumed = True
+        return self._iter()
+
+    def _iter(self):
+        adapt = self.field.adapt
+        items, self._items = self._items, None
+        for item in items:
+            yield adapt(item)
+
+    def __repr__(self):
+        return '<StreamValue of %s%s>' % (self.field.__class__.__name__, ' (consumed)' if self.consumed else '')
+
+
+def _get_lazy(field, instance, name, value):
+    """
+    Materialize a :class:`LazyValue`, keeping the result if it was set on
+    `instance` rather than being the field's default.
+    """
+    result = value.materialize()
+    values = instance.__values__
+    if values.get(name) is value:
+        values[name] = result
+    return result
+
 
 class FieldDescriptor(object):
     """
@@ -45,6 +239,10 @@ class FieldDescriptor(object):
         Set a value for this :class:`Field`. The value
         is adapted to the :class:`Field`'s type if needed.
         """
+        if not instance.__track_changes__:
+            self.field.set(instance, self.name, value)
+            return
+
         old_value = instance.__values__.get(self.name)
         new_value = self.field.set(instance, self.name, value)
         if new_value != old_value:
@@ -55,11 +253,27 @@ class Field(object):
     """
     A field
     """
+
+    #: Whether adapted values are immutable, so they can be cached with `cache_size`
+    cacheable = False
+
+    #: The :class:`AdaptCache` of adapted values, if any
+    cache = None
+
+    #: Whether raw values are kept as a :class:`LazyValue` until the field is read
+    lazy = False
+
     def __init__(self, default=Empty, doc=None, *args, **kwargs):
         """
         :param default: The default value if no value is assigned to this field
         :param doc: The docstring to assign to this field and its descriptor
+        :param cache_size: Cache up to this many adapted text values. See
+                           :class:`AdaptCache`. Defaults to
+                           :data:`DEFAULT_CACHE_SIZE` if the field is
+                           :attr:`cacheable`.
         """
+        cache_size = kwargs.pop('cache_size', None)
+
         if callable(default):
             self.default = default
         elif default is not None and default is not Empty:
@@ -69,6 +283,26 @@ class Field(object):
 
         self.__doc__ = doc
 
+        if cache_size is None:
+            cache_size = DEFAULT_CACHE_SIZE if self.cacheable else 0
+        elif cache_size and not self.cacheable:
+            raise TypeError('%s values can not be cached' % self.__class__.__name__)
+
+        if cache_size:
+            self.cache = AdaptCache(cache_size)
+            self.adapt = self.cache.wrap(self.adapt)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The cached `adapt` is a closure, which can't be pickled
+        state.pop('adapt', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.cache is not None:
+            self.adapt = self.cache.wrap(self.adapt)
+
     def init(self, cls):
         """
         Initialize the field for its owner :class:`Entity` class. Any specialization
@@ -105,6 +339,29 @@ class Field(object):
         """
         return value
 
+    def adapt_many(self, values):
+        """
+        Adapt a sequence of values, such as a column of a table, as if
+        :meth:`adapt` was called for each value.
+
+        :returns: A `list` of adapted values
+        :raises AdaptManyError: With the index of every value that could not
+                                be adapted
+        """
+        result = []
+        errors = []
+        adapt = self.adapt
+        for i, value in enumerate(values):
+            try:
+                result.append(adapt(value))
+            except (OverflowError, TypeError, ValueError) as e:
+                errors.append((i, e))
+                result.append(None)
+
+        if errors:
+            raise AdaptManyError(errors)
+        return result
+
     def make_descriptor(self, name):
         """
         Create a descriptor for this :class:`Field` to attach to
@@ -128,6 +385,85 @@ class Field(object):
         """
         return value
 
+    def compile_serializer(self, method, value, namespace):
+        """
+        Get Python source for an expression that serializes `value` for
+        the compiled serializers of an :class:`Entity` class.
+
+        Override this alongside :meth:`flatten` or :meth:`jsonify` to inline
+        the conversion. By default the field's method is called.
+
+        :param method: Either ``'flatten'`` or ``'jsonify'``
+        :param value: The name of the variable that holds the value
+        :param namespace: A :class:`springfield.compiler.Namespace` to add
+                          objects the expression refers to
+        :returns: An expression, or ``None`` if the method leaves values unchanged
+        """
+        if getattr(type(self), method) is getattr(Field, method):
+            return None
+        return '%s(%s)' % (namespace.add(getattr(self, method), method), value)
+
+
+#: Resolved adapters keyed by `(field class, field type, input type)`
+_adapter_cache = {}
+
+
+def _identity(field, value):
+    return value
+
+
+def _adapt_with_type(field, value):
+    return field.type.__adapt__(value)
+
+
+def _adapt_with_value(fallback):
+    """
+    Use an object's own adapter, continuing with `fallback` if it can't adapt.
+    """
+    def adapt_with_value(field, value):
+        try:
+            return value.__adapt__(field.type)
+        except TypeError:
+            return fallback(field, value)
+    return adapt_with_value
+
+
+def _adapt_with_registered(adapter):
+    def adapt_with_registered(field, value):
+        return adapter(value)
+    return adapt_with_registered
+
+
+def _memoize(adapter):
+    """
+    Adapt each distinct value once.
+    """
+    results = {}
+
+    def adapt_memoized(field, value):
+        result = results.get(value)
+        if result is None:
+            result = results[value] = adapter(field, value)
+        return result
+    return adapt_memoized
+
+
+def _adapt_with_generic(convert):
+    """
+    Use generic adapters, continuing with `convert` if they can't adapt.
+    """
+    def adapt_with_generic(field, value):
+        try:
+            return adapt(value, field.type)
+        except AdaptError:
+            pass
+
+        if convert is not None:
+            return convert(field, value)
+
+        raise field._adapt_error(value)
+    return adapt_with_generic
+
 
 class AdaptableTypeField(Field):
     """
@@ -140,39 +476,167 @@ class AdaptableTypeField(Field):
     #: The value type this :class:`Field` expects
     type = None
 
+    #: Map input types to functions that convert a value of that type to
+    #: `type`. Each function is called with the field and the value.
+    #:
+    #: Values whose type is a key are converted without trying the
+    #: generic `anticipate` adapters first. Values of a subclass of a key are
+    #: converted if no other adapter could adapt them.
+    conversions = {}
+
+    #: The NumPy dtype :meth:`adapt_many` returns arrays of, if any
+    array_dtype = None
+
     def adapt(self, value):
         """
         Convert the `value` to the `self.type` for this :class:`Field`
+
+        How to adapt is resolved once per input type and cached.
+        See :meth:`resolve_adapter`.
         """
         if value is None or value is Empty:
             return value
 
-        if isinstance(value, self.type):
-            return value
-        elif hasattr(value, '__adapt__'):
-            # Use an object's own adapter to adapt.
+        from_type = type(value)
+        key = (self.__class__, self.type, from_type)
+        adapter = _adapter_cache.get(key)
+        if adapter is None:
+            adapter = _adapter_cache[key] = self.resolve_adapter(from_type)
+        return adapter(self, value)
+
+    def adapt_many(self, values):
+        """
+        Adapt a sequence of values, such as a column of a table, as if
+        :meth:`adapt` was called for each value.
+
+        If NumPy is installed and the field has an :attr:`array_dtype`, a
+        NumPy array is returned unless a value is ``None`` or too large
+        for the array. NumPy arrays of numbers are adapted without looking
+        at each value.
+
+        :returns: A `list` or NumPy array of adapted values
+        :raises AdaptManyError: With the index of every value that could not
+                                be adapted
+        """
+        if self.cache is not None or type(self).adapt is not AdaptableTypeField.adapt:
+            # The field adapts values in its own way
+            return super(AdaptableTypeField, self).adapt_many(values)
+
+        if numpy is None or self.array_dtype is None:
+            return self._adapt_list(values)[0]
+
+        if isinstance(values, numpy.ndarray):
+            with numpy.errstate(invalid='ignore', over='ignore'):
+                array = self._adapt_array(values)
+            if array is not None:
+                return array
+            values = values.tolist()
+
+        result, has_none = self._adapt_list(values)
+        if has_none:
+            return result
+        try:
+            return numpy.array(result, dtype=self.array_dtype)
+        except (OverflowError, TypeError, ValueError):
+            return result
+
+    def _adapt_array(self, values):
+        """
+        Adapt a NumPy array of values in bulk.
+
+        :returns: An array of :attr:`array_dtype`, or ``None`` to adapt
+                  each value instead
+        """
+        return None
+
+    def _adapt_list(self, values, adapters=None):
+        """
+        Adapt each value, resolving adapters once per input type.
+
+        :param adapters: Adapters to use for some input types
+        :returns: The `list` of values and whether any value is ``None``
+        """
+        if adapters is None:
+            adapters = {}
+        result = []
+        errors = []
+        has_none = False
+        for i, value in enumerate(values):
+            if value is None or value is Empty:
+                has_none = True
+                result.append(value)
+                continue
+
+            from_type = type(value)
+            adapter = adapters.get(from_type)
+            if adapter is None:
+                adapter = adapters[from_type] = self._get_adapter(from_type)
             try:
-                return value.__adapt__(self.type)
-            except TypeError:
-                pass
+                result.append(adapter(self, value))
+            except (OverflowError, TypeError, ValueError) as e:
+                errors.append((i, e))
+                result.append(None)
+
+        if errors:
+            raise AdaptManyError(errors)
+        return result, has_none
+
+    def _get_adapter(self, from_type):
+        key = (self.__class__, self.type, from_type)
+        adapter = _adapter_cache.get(key)
+        if adapter is None:
+            adapter = _adapter_cache[key] = self.resolve_adapter(from_type)
+        return adapter
+
+    def resolve_adapter(self, from_type):
+        """
+        Determine how to adapt values of `from_type` for this :class:`Field`.
+
+        In order of preference, values are adapted by:
+
+        * Leaving values that are already the expected type unchanged
+        * The value's own `__adapt__` method
+        * The expected type's `__adapt__` method
+        * An adapter registered with :meth:`register_adapter`
+        * The field's :attr:`conversions`
+        * Generic `anticipate` adapters
+
+        :param from_type: The type of the input values
+        :returns: A function that takes the field and a value and returns
+                  the adapted value
+        """
+        if issubclass(from_type, self.type):
+            return _identity
 
+        adapter = self._resolve_fallback_adapter(from_type)
+        if hasattr(from_type, '__adapt__'):
+            adapter = _adapt_with_value(adapter)
+        return adapter
+
+    def _resolve_fallback_adapter(self, from_type):
         if hasattr(self.type, '__adapt__'):
-            # Try using the type's adapter
-            return self.type.__adapt__(value)
+            return _adapt_with_type
 
         if self.__class__.__adapters__:
-            # Use a registered adapter
-            adapter = self.__class__.__adapters__.get(type(value), None)
-            if adapter:
-                return adapter(value)
+            registered = self.__class__.__adapters__.get(from_type, None)
+            if registered:
+                return _adapt_with_registered(registered)
 
-        try:
-            # Use generic adapters
-            return adapt(value, self.type)
-        except AdaptError:
-            pass
+        convert = self.conversions.get(from_type)
+        if convert is not None:
+            return convert
 
-        raise TypeError('Could not adapt %r to %r' % (value, self.type))
+        for conversion_type, convert in self.conversions.items():
+            if issubclass(from_type, conversion_type):
+                return _adapt_with_generic(convert)
+
+        return _adapt_with_generic(None)
+
+    def _adapt_error(self, value):
+        """
+        Get the error to raise when `value` can not be adapted.
+        """
+        return TypeError('Could not adapt %r to %r' % (value, self.type))
 
     @classmethod
     def register_adapter(cls, from_cls, func):
@@ -187,102 +651,152 @@ class AdaptableTypeField(Field):
 
         cls.__adapters__[from_cls] = func
 
+        # Adapters resolved before this one was registered may be stale
+        _adapter_cache.clear()
+
 
 class IntField(AdaptableTypeField):
     """
     A :class:`Field` that contains an `int`.
-    """
-    type = int
-
-    def adapt(self, value):
-        """
-        Adapt `value` to an `int`.
 
-        :param value: Can be an `int`, `float`, `long`, or a
-                      `str` or `unicode` that looks like an `int`.
+    Values can be an `int`, `float`, `long`, or a `str` or `unicode`
+    that looks like an `int`.
 
-                      `float` or `long` values must represent an
-                      integer, i.e. no decimal places.
-        """
-        try:
-            return super(IntField, self).adapt(value)
-        except TypeError:
-            if isinstance(value, string_types):
-                return int(value)
-            elif isinstance(value, (float,) + integer_types):
-                t = int(value)
-                if t == value:
-                    return t
+    `float` or `long` values must represent an integer, i.e. no decimal places.
+    """
+    type = int
 
-            raise
+    def _from_string(self, value):
+        return int(value)
+
+    def _from_number(self, value):
+        t = int(value)
+        if t == value:
+            return t
+        raise self._adapt_error(value)
+
+    conversions = dict.fromkeys(string_types, _from_string)
+    conversions.update(dict.fromkeys((float,) + integer_types, _from_number))
+
+    array_dtype = 'int64'
+
+    def adapt_many(self, values):
+        if numpy is not None and isinstance(values, numpy.ndarray) and values.dtype.kind == 'b':
+            # `adapt` keeps booleans as they are rather than turning them into 0 and 1
+            return Field.adapt_many(self, values.tolist())
+        return super(IntField, self).adapt_many(values)
+
+    def _adapt_array(self, values):
+        kind = values.dtype.kind
+        if kind == 'i' or (kind == 'u' and values.dtype.itemsize < 8):
+            return values.astype(numpy.int64)
+        elif kind == 'f':
+            result = values.astype(numpy.int64)
+            # Floats must represent an integer
+            if (result == values).all():
+                return result
+        elif kind in _string_kinds:
+            try:
+                return values.astype(numpy.int64)
+            except (OverflowError, ValueError):
+                # Adapt each value to report which ones are invalid
+                pass
+        return None
 
 
 class FloatField(AdaptableTypeField):
     """
     A :class:`Field` that contains a `float`.
+
+    Values can be an `int`, `float`, `long`, `Decimal`, or a `str` or
+    `unicode` that looks like a `float`.
+
+    `long` values will remain `long`s.
     """
     type = float
 
-    def adapt(self, value):
-        """
-        Adapt `value` to a `float`.
+    def _from_number(self, value):
+        return float(value)
 
-        :param value: Can be an `int`, `float`, `long`, or a
-                      `str` or `unicode` that looks like a `float`.
+    def _from_long(self, value):
+        return value
 
-                      `long` values will remain `long`s.
-        """
-        try:
-            return super(FloatField, self).adapt(value)
-        except TypeError:
-            if isinstance(value, (int,) + string_types):
-                return float(value)
-            elif isinstance(value, (float,) + integer_types):
-                return value
-            elif isinstance(value, Decimal):
-                return float(value)
+    conversions = dict.fromkeys(integer_types, _from_long)
+    conversions.update(dict.fromkeys((int, Decimal) + string_types, _from_number))
 
-            raise
+    array_dtype = 'float64'
+
+    def _adapt_array(self, values):
+        kind = values.dtype.kind
+        if kind in 'iuf':
+            return values.astype(numpy.float64)
+        elif kind in _string_kinds:
+            try:
+                return values.astype(numpy.float64)
+            except ValueError:
+                pass
+        return None
 
 
 class BooleanField(AdaptableTypeField):
     """
     A :class:`Field` that contains a `bool`.
-    """
-    type = bool
 
-    def adapt(self, value):
-        """
-        Adapt `value` to a `bool`.
+    Values can be any boolean-like value.
 
-        :param value: A boolean-like value.
+    A `float`, `int`, or `long` will be converted to:
 
-                      A `float`, `int`, or `long` will be converted to:
+        * `True` if equal to `1`
+        * `False` if equal to `0`
 
-                          * `True` if equal to `1`
-                          * `False` if equal to `0`
+    String values will be converted to (case-insensitive):
 
-                      String values will be converted to (case-insensitive):
-
-                          * `True` if equal to "yes", "true", "1", or "on"
-                          * `False` if equal to "no", "false", "0", or "off"
-        """
-        try:
-            return super(BooleanField, self).adapt(value)
-        except TypeError:
-            if isinstance(value, string_types):
-                str = value.lower()
-                if str in ['yes', 'true', '1', 'on']:
-                    return True
-                elif str in ['no', 'false', '0', 'off']:
-                    return False
-            elif isinstance(value, (float,) + integer_types):
-                if value == 1:
-                    return True
-                elif value == 0:
-                    return False
+        * `True` if equal to "yes", "true", "1", or "on"
+        * `False` if equal to "no", "false", "0", or "off"
+    """
+    type = bool
 
-            raise
+    _strings = {
+        'yes': True,
+        'true': True,
+        '1': True,
+        'on': True,
+        'no': False,
+        'false': False,
+        '0': False,
+        'off': False,
+    }
+
+    def _from_string(self, value):
+        result = self._strings.get(value.lower())
+        if result is None:
+            raise self._adapt_error(value)
+        return result
+
+    def _from_number(self, value):
+        if value == 1:
+            return True
+        elif value == 0:
+            return False
+        raise self._adapt_error(value)
+
+    conversions = dict.fromkeys(string_types, _from_string)
+    conversions.update(dict.fromkeys((float,) + integer_types, _from_number))
+
+    array_dtype = 'bool'
+
+    def _adapt_array(self, values):
+        kind = values.dtype.kind
+        if kind == 'b':
+            return values.copy()
+        elif kind in 'iuf' and ((values == 0) | (values == 1)).all():
+            return values != 0
+        elif kind in _string_kinds:
+            values = numpy.char.lower(values)
+            true = numpy.isin(values, [k for k, v in self._strings.items() if v])
+            if (true | numpy.isin(values, [k for k, v in self._strings.items() if not v])).all():
+                return true
+        return None
 
 
 class StringField(AdaptableTypeField):
@@ -291,16 +805,10 @@ class StringField(AdaptableTypeField):
     """
     type = text_type
 
-    def adapt(self, value):
-        """
-        Adapt `value` to `unicode`.
-        """
-        try:
-            return super(StringField, self).adapt(value)
-        except TypeError:
-            if isinstance(value, string_types):
-                return text_type(value)
-            raise
+    def _from_string(self, value):
+        return text_type(value)
+
+    conversions = dict.fromkeys(string_types, _from_string)
 
 
 class BytesField(AdaptableTypeField):
@@ -320,6 +828,7 @@ class BytesField(AdaptableTypeField):
     """
 
     type = bytes
+    cacheable = True
     encoding = 'base64'
 
     def __init__(self, encoding='base64', *args, **kwargs):
@@ -351,10 +860,9 @@ class BytesField(AdaptableTypeField):
         # Convert to unicode using an 8-bit encoding to retain binary data
         return decode(value, 'latin1')
 
-    def adapt(self, value):
+    def _from_text(self, value):
         """
-        If the input is unicode, decode it into bytes.  If it is already
-        bytes, it is returned unchanged.
+        If the input is unicode, decode it into bytes.
 
         If an encoding was specific for the field, it is applied here if the input
         is `unicode`.
@@ -365,15 +873,15 @@ class BytesField(AdaptableTypeField):
         :param value: Value to decode
         :return: `bytes` object
         """
-        if isinstance(value, text_type):
-            try:
-                value = encode(value, 'latin1')
-                if self.encoding:
-                    value = decode(value, self.encoding)
-            except binascii.Error as e:
-                raise_from(TypeError, e)
+        try:
+            value = encode(value, 'latin1')
+            if self.encoding:
+                value = decode(value, self.encoding)
+        except binascii.Error as e:
+            raise_from(TypeError, e)
+        return value
 
-        return super(BytesField, self).adapt(value)
+    conversions = {text_type: _from_text}
 
 
 class SlugField(StringField):
@@ -384,6 +892,8 @@ class SlugField(StringField):
     replace with a "-" and non-ascii chars converted to their
     ascii equivalents.
     """
+    cacheable = True
+
     def adapt(self, value):
         """
         Adapt `value` to a slugified string.
@@ -408,25 +918,45 @@ class SlugField(StringField):
 class DateTimeField(AdaptableTypeField):
     """
     :class:`Field` whose value is a Python `datetime.datetime`
+
+    Values can be a `datetime` or an RFC3339 formatted date-string.
     """
     type = datetime
+    cacheable = True
 
-    def adapt(self, value):
+    def __init__(self, *args, **kwargs):
+        """
+        :param lenient: Parse date-strings in other formats with
+                        `dateutil.parser.parse` if they aren't RFC3339
+        :raises ImportError: If `lenient` is set and dateutil isn't installed
         """
-        Adapt `value` to a `datetime.datetime` instance.
+        self.lenient = kwargs.pop('lenient', False)
+        if self.lenient and _lenient_parse is None:
+            raise ImportError('dateutil is required for DateTimeField(lenient=True)')
+        super(DateTimeField, self).__init__(*args, **kwargs)
 
-        :param value: A date-like value. RFC3339 formatted date-strings
-                      are supported.
+    def _from_string(self, value):
+        return date_parse(value, self.lenient)
 
-                      If `dateutil` is installed, `dateutil.parser.parse`
-                      is used which supports many date formats.
+    conversions = dict.fromkeys(string_types, _from_string)
+
+    def adapt_many(self, values):
         """
-        try:
-            return super(DateTimeField, self).adapt(value)
-        except TypeError:
-            if isinstance(value, string_types):
-                return date_parse(value)
-            raise
+        Adapt a sequence of values, such as a column of a table, as if
+        :meth:`adapt` was called for each value.
+
+        Columns often repeat the same dates, so each distinct date-string
+        is only parsed once.
+
+        :returns: A `list` of `datetime` values
+        :raises AdaptManyError: With the index of every value that could not
+                                be adapted
+        """
+        if type(self).adapt is not AdaptableTypeField.adapt:
+            return super(DateTimeField, self).adapt_many(values)
+
+        adapters = dict((t, _memoize(self._get_adapter(t))) for t in string_types)
+        return self._adapt_list(values, adapters)[0]
 
     def jsonify(self, value):
         """
@@ -435,6 +965,12 @@ class DateTimeField(AdaptableTypeField):
         if value is not None:
             return generate_rfc3339(value)
 
+    def compile_serializer(self, method, value, namespace):
+        if method == 'jsonify' and type(self).jsonify is DateTimeField.jsonify:
+            return '(None if {0} is None else {1}({0}))'.format(
+                value, namespace.add(generate_rfc3339, 'generate_rfc3339'))
+        return super(DateTimeField, self).compile_serializer(method, value, namespace)
+
 
 class EmailField(StringField):
     """
@@ -446,6 +982,8 @@ class UrlField(StringField):
     """
     :class:`Field` with a URL value
     """
+    cacheable = True
+
     def adapt(self, value):
         """
         Validate that the `value` has a valid URL format containing
@@ -480,9 +1018,16 @@ class EntityField(AdaptableTypeField):
         :param entity: The :class:`Entity` class to expect for this field.
                        Use 'self' to use the :class:`Entity` class that
                        this field is already bound to.
+        :param lazy: Keep `dict` values as they are until the field is
+                     read. :meth:`flatten` and :meth:`jsonify` return the
+                     `dict` itself if the field hasn't been read, without
+                     validating it, so it may have unknown keys and values
+                     that haven't been adapted, such as strings for numbers.
         """
         self._type = entity
+        lazy = kwargs.pop('lazy', False)
         super(EntityField, self).__init__(*args, **kwargs)
+        self.lazy = lazy
 
     @staticmethod
     def _resolve_dotted_name(dotted_name):
@@ -547,12 +1092,30 @@ class EntityField(AdaptableTypeField):
         if self._type == 'self':
             self._type = cls
 
+    def get(self, instance, name):
+        value = super(EntityField, self).get(instance, name)
+        if type(value) is LazyValue:
+            value = _get_lazy(self, instance, name, value)
+        return value
+
+    def adapt(self, value):
+        if type(value) is LazyValue:
+            value = value.raw
+        if self.lazy and isinstance(value, dict):
+            return LazyValue(self, value)
+        return self._adapt_now(value)
+
+    def _adapt_now(self, value):
+        return super(EntityField, self).adapt(value)
+
     def flatten(self, value):
         """
         Convert an :class:`Entity` to a `dict` containing native
         Python types.
         """
         if value is not None:
+            if type(value) is LazyValue:
+                return value.raw
             return value.flatten()
 
     def jsonify(self, value):
@@ -560,8 +1123,19 @@ class EntityField(AdaptableTypeField):
         Convert an :class:`Entity` into a JSON object
         """
         if value is not None:
+            if type(value) is LazyValue:
+                return value.raw
             return value.jsonify()
 
+    def compile_serializer(self, method, value, namespace):
+        if getattr(type(self), method) is getattr(EntityField, method):
+            # Recurse into the nested entity's own compiled serializer
+            if self.lazy:
+                return '(None if {0} is None else {0}.raw if type({0}) is {2} else {0}.{1}())'.format(
+                    value, method, namespace.add(LazyValue, 'LazyValue'))
+            return '(None if {0} is None else {0}.{1}())'.format(value, method)
+        return super(EntityField, self).compile_serializer(method, value, namespace)
+
 
 class IdField(Field):
     """
@@ -580,20 +1154,58 @@ class CollectionField(Field):
     #: The :class:`Field` this collection contains
     field = None
 
+    #: Whether iterators are kept as a :class:`StreamValue`
+    stream = False
+
     def __init__(self, field, *args, **kwargs):
+        """
+        :param field: The :class:`Field` of the items
+        :param lazy: Keep `list` and `tuple` values as they are until the
+                     field is read. :meth:`flatten` and :meth:`jsonify`
+                     return the raw value itself if the field hasn't been
+                     read, without validating or adapting its items.
+        :param stream: Keep values that aren't a `list` or `tuple`, such as
+                       generators, as a single-pass :class:`StreamValue`
+                       that adapts items as they are read. Reading the field,
+                       :meth:`flatten`, :meth:`jsonify` and
+                       :meth:`Entity.dump_json` all consume the stream.
+        """
         if not isinstance(field, Field):
             field = field()
+        if field.lazy:
+            raise ValueError('Items can not be lazy, use CollectionField(..., lazy=True)')
         self.field = field
+        lazy = kwargs.pop('lazy', False)
+        stream = kwargs.pop('stream', False)
+        if lazy and stream:
+            raise ValueError('A CollectionField can not be both lazy and streaming')
         super(CollectionField, self).__init__(*args, **kwargs)
+        self.lazy = lazy
+        self.stream = stream
 
     def init(self, cls):
         self.field.init(cls)
 
+    def get(self, instance, name):
+        value = super(CollectionField, self).get(instance, name)
+        if type(value) is LazyValue:
+            value = _get_lazy(self, instance, name, value)
+        return value
+
     def adapt(self, value):
         """
         Adapt all values of an iterable to the :class:`CollectionField`'s
         field type.
         """
+        if type(value) is LazyValue:
+            value = value.raw
+        if self.lazy and isinstance(value, (list, tuple)):
+            return LazyValue(self, value)
+        if self.stream and value is not None and not isinstance(value, (list, tuple)):
+            return StreamValue(self.field, iter(value))
+        return self._adapt_now(value)
+
+    def _adapt_now(self, value):
         if value is not None:
             values = []
             for item in value:
@@ -605,6 +1217,8 @@ class CollectionField(Field):
         Convert all values of an iterable to the :class:`CollectionField`'s
         field type's native Python type.
         """
+        if type(value) is LazyValue:
+            return value.raw
         if value is not None:
             values = []
             for item in value:
@@ -617,6 +1231,8 @@ class CollectionField(Field):
         Convert all values of an iterable to the :class:`CollectionField`'s
         field type's JSON type.
         """
+        if type(value) is LazyValue:
+            return value.raw
         if value is not None:
             values = []
             for item in value:
@@ -624,6 +1240,20 @@ class CollectionField(Field):
 
             return values
 
+    def compile_serializer(self, method, value, namespace):
+        if getattr(type(self), method) is not getattr(CollectionField, method):
+            return super(CollectionField, self).compile_serializer(method, value, namespace)
+
+        item = namespace.var('item')
+        expr = self.field.compile_serializer(method, item, namespace)
+        if expr is None:
+            expr = 'list({0})'.format(value)
+        else:
+            expr = '[{1} for {2} in {0}]'.format(value, expr, item)
+        if self.lazy:
+            expr = '{0}.raw if type({0}) is {1} else {2}'.format(value, namespace.add(LazyValue, 'LazyValue'), expr)
+        return '(None if {0} is None else {1})'.format(value, expr)
+
 
 #: Map basic types to fields
 _type_map = {
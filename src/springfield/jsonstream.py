@@ -0,0 +1,388 @@
+"""
+Incremental JSON reading and writing for large documents.
+
+:func:`iter_items` reads a file-like object a chunk at a time and yields
+each element of a JSON array as soon as it has been read, so only one
+element needs to be in memory at a time.
+
+If `ijson <https://pypi.org/project/ijson/>`_ is installed it is used
+to parse the document, otherwise a parser built on the standard library
+`json` module is used.
+
+:func:`dump_json` and :func:`dump_json_iter` write entities to a file-like
+object without building the intermediate `dict` from :meth:`Entity.jsonify`.
+"""
+import codecs
+import json
+import re
+
+from six import text_type
+
+from springfield import fields
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+#: The default number of characters to read at a time
+CHUNK_SIZE = 64 * 1024
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+_structure = re.compile(r'["\[\]{}]')
+_string_end = re.compile(r'["\\]')
+_number_chars = frozenset('0123456789.eE+-')
+
+
+class _Reader(object):
+    """
+    Reads JSON tokens from a file-like object, keeping only the
+    unread part of the document in memory.
+    """
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = u''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self._bytes_decoder = None
+
+    def read(self, size=None):
+        """
+        Read more of the document into the buffer.
+
+        :returns: `False` if the end of the document was reached
+        """
+        if self.eof:
+            return False
+
+        # Drop what has already been parsed
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+
+        while True:
+            raw = self.fp.read(size or self.chunk_size)
+            if isinstance(raw, text_type):
+                chunk = raw
+                break
+            if self._bytes_decoder is None:
+                self._bytes_decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = self._bytes_decoder.decode(raw, final=not raw)
+            if chunk or not raw:
+                break
+            # The chunk ended inside a multi-byte character, keep reading
+
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buffer += chunk
+        return True
+
+    def peek(self):
+        """
+        Skip whitespace and get the next character, or ``''`` at the end
+        of the document.
+        """
+        while True:
+            self.pos = _whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read():
+                return ''
+
+    def expect(self, chars):
+        """
+        Consume the next character, which must be one of `chars`.
+        """
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError('Expected %s at position %d' % (' or '.join(repr(c) for c in chars), self.pos))
+        self.pos += 1
+        return char
+
+    def decode(self):
+        """
+        Decode the next JSON value.
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # The value may continue past the end of the buffer
+                if self.read(size):
+                    size *= 2
+                    continue
+                raise
+
+            if (end == len(self.buffer) or self.buffer[end] in _number_chars) and self.read(size):
+                # A number at the end of the buffer may be incomplete
+                size *= 2
+                continue
+
+            self.pos = end
+            return value
+
+    def skip(self):
+        """
+        Skip the next JSON value without decoding it.
+        """
+        char = self.peek()
+        if char not in '[{"':
+            # A number or literal, decode it since it is small
+            self.decode()
+            return
+
+        depth = 0
+        while True:
+            match = _structure.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+                if not self.read():
+                    raise ValueError('Unexpected end of document')
+                continue
+
+            char = match.group()
+            self.pos = match.end()
+            if char == '"':
+                self._skip_string()
+            elif char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+
+            if depth == 0:
+                return
+
+    def _skip_string(self):
+        while True:
+            match = _string_end.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+            elif match.group() == '"':
+                self.pos = match.end()
+                return
+            elif match.end() < len(self.buffer):
+                # Skip the escaped character
+                self.pos = match.end() + 1
+                continue
+            else:
+                # Keep a trailing backslash so its escaped character is skipped too
+                self.pos = match.start()
+
+            if not self.read():
+                raise ValueError('Unterminated string')
+
+
+def _iter_python(fp, keys, chunk_size):
+    reader = _Reader(fp, chunk_size)
+
+    for i, key in enumerate(keys):
+        if reader.peek() not in '{':
+            # Values other than objects have no keys, like ijson
+            raise KeyError('.'.join(keys[:i + 1]))
+        reader.expect('{')
+        while True:
+            if reader.peek() == '}':
+                raise KeyError('.'.join(keys[:i + 1]))
+            name = reader.decode()
+            reader.expect(':')
+            if name == key:
+                break
+            reader.skip()
+            if reader.expect(',}') == '}':
+                raise KeyError('.'.join(keys[:i + 1]))
+
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+
+    while True:
+        yield reader.decode()
+        if reader.expect(',]') == ']':
+            return
+
+
+def _iter_ijson(fp, keys):
+    path = '.'.join(keys)
+    found = []
+
+    def events():
+        for prefix, event, value in ijson.parse(fp, use_float=True):
+            if not found and prefix == path:
+                if event != 'start_array':
+                    raise ValueError('Expected an array at %s' % (path or 'the top level'))
+                found.append(True)
+            yield prefix, event, value
+
+    for item in ijson.items(events(), '.'.join(keys + ['item'])):
+        yield item
+    if not found:
+        raise KeyError(path)
+
+
+def iter_items(fp, path=None, chunk_size=CHUNK_SIZE, backend=None):
+    """
+    Incrementally read the elements of a JSON array.
+
+    :param fp: A file-like object with a `read` method that returns
+               text or UTF-8 encoded bytes
+    :param path: Dot notation keys of the array in the document, e.g.
+                 ``'data.items'``. The document itself is the array if
+                 ``None``.
+    :param chunk_size: The number of characters to read at a time
+    :param backend: ``'python'`` or ``'ijson'``. Defaults to ``'ijson'`` if
+                    it is installed.
+    :returns: A generator of decoded elements
+    :raises KeyError: If `path` isn't in the document
+    :raises ValueError: If the value at `path` isn't an array
+    """
+    keys = path.split('.') if path else []
+
+    if backend is None:
+        backend = 'ijson' if ijson is not None else 'python'
+
+    if backend == 'ijson':
+        if ijson is None:
+            raise ValueError('The ijson backend is not installed.')
+        return _iter_ijson(fp, keys)
+    elif backend == 'python':
+        return _iter_python(fp, keys, chunk_size)
+
+    raise ValueError('Unknown JSON backend %r' % backend)
+
+
+class _ChunkWriter(object):
+    """
+    Collects text and writes it to a file-like object in chunks of
+    about `chunk_size` characters.
+    """
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self.size = 0
+
+    def write(self, text):
+        self.chunks.append(text)
+        self.size += len(text)
+        if self.size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.chunks:
+            self.fp.write(u''.join(self.chunks))
+            self.chunks = []
+            self.size = 0
+
+
+# Match the output of `json.dumps`
+_encode = json.JSONEncoder().encode
+
+
+class _EntityWriter(object):
+    """
+    Writes entities as JSON text by walking their fields.
+    """
+    def __init__(self, write):
+        from springfield.entity import Entity, FlexEntity
+
+        self.write = write
+        self._standard_jsonify = (Entity.jsonify, FlexEntity.jsonify)
+
+    def write_entity(self, entity):
+        write = self.write
+        if type(entity).jsonify not in self._standard_jsonify:
+            # The entity serializes itself in its own way
+            write(_encode(entity.jsonify()))
+            return
+
+        _fields = entity.__fields__
+        separator = u'{'
+        for key, value in entity.__values__.items():
+            write(separator)
+            write(_encode(key))
+            write(u': ')
+            separator = u', '
+
+            field = _fields.get(key)
+            if field is None:
+                # A flex field
+                write(_encode(entity._jsonify_value(value)))
+            else:
+                self.write_value(field, value)
+
+        if separator == u'{':
+            write(u'{}')
+        else:
+            write(u'}')
+
+    def write_value(self, field, value):
+        write = self.write
+        if value is None:
+            write(u'null')
+        elif type(value) is fields.LazyValue:
+            # Reuse the raw value of a lazy field
+            write(_encode(value.raw))
+        elif isinstance(field, fields.EntityField) and type(field).jsonify is fields.EntityField.jsonify:
+            self.write_entity(value)
+        elif isinstance(field, fields.CollectionField) and type(field).jsonify is fields.CollectionField.jsonify:
+            separator = u'['
+            for item in value:
+                write(separator)
+                separator = u', '
+                self.write_value(field.field, item)
+
+            if separator == u'[':
+                write(u'[]')
+            else:
+                write(u']')
+        else:
+            write(_encode(field.jsonify(value)))
+
+
+def dump_json(entity, fp, chunk_size=CHUNK_SIZE):
+    """
+    Write an entity as JSON to a file-like object.
+
+    The output is the same as :meth:`Entity.to_json`, but is written in
+    chunks while walking the entity's fields.
+
+    :param entity: An :class:`Entity`
+    :param fp: A file-like object opened for writing text
+    :param chunk_size: The number of characters to write at a time
+    """
+    writer = _ChunkWriter(fp, chunk_size)
+    _EntityWriter(writer.write).write_entity(entity)
+    writer.flush()
+
+
+def dump_json_iter(entities, fp, chunk_size=CHUNK_SIZE):
+    """
+    Write an iterable of entities as a JSON array to a file-like object.
+
+    Entities are written as they are taken from `entities`, so it can be
+    a generator.
+
+    :param entities: An iterable of :class:`Entity` instances
+    :param fp: A file-like object opened for writing text
+    :param chunk_size: The number of characters to write at a time
+    """
+    writer = _ChunkWriter(fp, chunk_size)
+    write = writer.write
+    entity_writer = _EntityWriter(write)
+    separator = u'['
+    for entity in entities:
+        write(separator)
+        separator = u', '
+        entity_writer.write_entity(entity)
+
+    if separator == u'[':
+        write(u'[]')
+    else:
+        write(u']')
+    writer.flush()
@@ -0,0 +1,141 @@
+"""
+Read and write newline-delimited JSON where each line is an entity.
+
+Parsing and adapting can be spread over the workers of a
+`concurrent.futures` executor, such as a `ProcessPoolExecutor`, to use
+more than one core::
+
+    from concurrent.futures import ProcessPoolExecutor
+    from springfield import ndjson
+
+    with ndjson.open_file('users.ndjson.gz') as fp, ProcessPoolExecutor() as executor:
+        for user in ndjson.read(fp, User, executor=executor):
+            ...
+"""
+from __future__ import absolute_import
+
+import collections
+import gzip
+import io
+import itertools
+import json
+
+#: Entity classes resolved from import paths in this process
+_entity_classes = {}
+
+
+def entity_path(entity):
+    """
+    Get the import path of an :class:`Entity` class, e.g.
+    ``'app.models:Outer.Inner'`` for a class nested in another class.
+
+    :raises ValueError: If the class was defined in a function, so workers
+                        can't import it
+    """
+    name = getattr(entity, '__qualname__', entity.__name__)
+    if '<locals>' in name:
+        raise ValueError('%s was defined in a function and can not be imported by workers' % name)
+    return '%s:%s' % (entity.__module__, name)
+
+
+def _resolve_entity(path):
+    entity = _entity_classes.get(path)
+    if entity is None:
+        module, name = path.split(':', 1)
+        entity = __import__(module, fromlist=['__name__'])
+        for attr in name.split('.'):
+            entity = getattr(entity, attr)
+        _entity_classes[path] = entity
+    return entity
+
+
+def _load_lines(path, lines):
+    """
+    Parse and adapt lines to the :class:`Entity` class at import `path`.
+
+    Workers are only sent the path so the class itself isn't pickled with
+    every chunk.
+    """
+    entity = _resolve_entity(path)
+    return [entity(**json.loads(line)) for line in lines]
+
+
+def _iter_chunks(fp, chunk_size):
+    lines = (line for line in fp if line.strip())
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read(fp, entity, executor=None, chunk_size=1000, max_pending=8):
+    """
+    Read entities from newline-delimited JSON. Blank lines are skipped.
+
+    :param fp: A file-like object to read lines from
+    :param entity: The :class:`Entity` class of each line. It must be
+                   importable by workers when using an `executor`, so it
+                   can't be defined in a function.
+    :param executor: An optional `concurrent.futures.Executor` to parse
+                     chunks of lines with
+    :param chunk_size: The number of lines to send to a worker at a time
+    :param max_pending: The most chunks to have submitted to the executor
+                        at a time
+    :returns: A generator of entities in the order of their lines
+    :raises ValueError: If `entity` can't be imported by workers
+    """
+    if executor is None:
+        for line in fp:
+            if line.strip():
+                yield entity(**json.loads(line))
+        return
+
+    path = entity_path(entity)
+    pending = collections.deque()
+    try:
+        for chunk in _iter_chunks(fp, chunk_size):
+            pending.append(executor.submit(_load_lines, path, chunk))
+            if len(pending) >= max_pending:
+                for item in pending.popleft().result():
+                    yield item
+
+        while pending:
+            for item in pending.popleft().result():
+                yield item
+    finally:
+        # Don't parse the rest of the file if the generator was closed early
+        for future in pending:
+            future.cancel()
+
+
+def write(entities, fp):
+    """
+    Write entities as newline-delimited JSON.
+
+    :param entities: An iterable of :class:`Entity` instances
+    :param fp: A file-like object opened for writing text
+    """
+    for entity in entities:
+        fp.write(entity.to_json())
+        fp.write(u'\n')
+
+
+def open_file(filename, mode='r', compression='infer'):
+    """
+    Open a newline-delimited JSON file as UTF-8 text.
+
+    :param filename: The path of the file
+    :param mode: ``'r'``, ``'w'`` or ``'a'``
+    :param compression: ``'gzip'``, ``None``, or ``'infer'`` to use gzip
+                        if `filename` ends with ``.gz``
+    """
+    if compression == 'infer':
+        compression = 'gzip' if filename.endswith('.gz') else None
+
+    if compression == 'gzip':
+        return io.TextIOWrapper(gzip.open(filename, mode + 'b'), encoding='utf-8')
+    elif compression is None:
+        return io.open(filename, mode, encoding='utf-8')
+
+    raise ValueError('Unknown compression %r' % compression)
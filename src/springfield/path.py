@@ -0,0 +1,208 @@
+"""
+Compiled dot notation paths.
+
+A path like ``'child?.pos.top'`` refers to the ``top`` field of the
+``pos`` field of the ``child`` field. A ``?`` after a name "soaks" an
+empty value: getting the path returns :data:`Empty` instead of raising
+a `ValueError` when that field is empty.
+
+A ``*`` after a :class:`CollectionField` refers to each of its items, so
+``'bookmarks.*.uri'`` gets a flat list of the ``uri`` of every bookmark.
+Paths with a ``*`` can only be read, and soaked empty values are left out
+of the list.
+"""
+from springfield import fields
+from springfield.compiler import Namespace, attribute, compile_function, set_attribute
+from springfield.types import Empty
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def get_path(entity, target):
+    """
+    Get the :class:`FieldPath` for `target` from the cache of the
+    :class:`Entity` class `entity`, compiling it if needed.
+    """
+    path = entity.__paths__.get(target)
+    if path is None:
+        path = entity.__paths__[target] = FieldPath(entity, target)
+    return path
+
+
+class FieldPath(object):
+    """
+    A dot notation path through the fields of an :class:`Entity` class.
+
+    Use :meth:`Entity.path` or :func:`get_path` to get a cached
+    :class:`FieldPath` for a class.
+    """
+    def __init__(self, entity, target):
+        """
+        :param entity: The :class:`Entity` class the path starts at
+        :param target: The dot notation path, e.g. ``'child?.pos.top'``
+        """
+        self.entity = entity
+        self.target = target
+
+        #: `(key, name, field, soak)` for each step of the path
+        self.steps = self._resolve(entity, target)
+
+        #: The :class:`Field` at the end of the path
+        self.field = self.steps[-1][2]
+
+        #: Whether the path has a ``*`` and gets a list of values
+        self.wildcard = any(step[1] == '*' for step in self.steps)
+
+        #: ``get(entity)`` gets the value at the end of the path. Raises a
+        #: `ValueError` if a field along the path is empty and isn't soaked.
+        self.get = self._compile_get()
+
+        #: ``set(entity, value)`` sets the value at the end of the path,
+        #: creating entities along the path as needed. Raises a `KeyError`
+        #: if the path has a ``*``.
+        self.set = self._compile_set()
+
+        self._gather = self._compile_gather() if self.wildcard else None
+
+    def __repr__(self):
+        return '<FieldPath %s %r>' % (self.entity.__name__, self.target)
+
+    def gather(self, entities):
+        """
+        Get the values at the end of the path for each of `entities`.
+
+        Values of a path with a ``*`` are gathered into one flat list in a
+        single compiled traversal. If NumPy is installed and the field has
+        an `array_dtype`, such as an `IntField`, a NumPy array is returned
+        unless a value is empty.
+
+        :param entities: An iterable of entities
+        :returns: A `list` or NumPy array of values
+        """
+        if self._gather is not None:
+            result = self._gather(entities)
+        else:
+            get = self.get
+            result = [get(entity) for entity in entities]
+
+        dtype = getattr(self.field, 'array_dtype', None)
+        if numpy is not None and dtype is not None and not any(v is None or v is Empty for v in result):
+            try:
+                return numpy.array(result, dtype=dtype)
+            except (OverflowError, TypeError, ValueError):
+                pass
+        return result
+
+    @staticmethod
+    def _resolve(entity, target):
+        """
+        Find the field for each step of the path.
+        """
+        steps = []
+        names = target.split('.')
+        for i, name in enumerate(names):
+            soak = False
+            if name.endswith('?'):
+                # Targets like 'child?.key' use "soak" to allow `child` to be empty
+                name = name[:-1]
+                soak = True
+
+            if name == '*':
+                if not steps:
+                    raise KeyError(target)
+                # The items of the collection from the previous step
+                field = steps[-1][2].field
+            else:
+                field = entity.__fields__[name]
+            key = '.'.join([step[1] for step in steps] + [name])
+            steps.append((key, name, field, soak))
+
+            if i < len(names) - 1:
+                if names[i + 1].rstrip('?') == '*':
+                    if not isinstance(field, fields.CollectionField):
+                        raise KeyError('Expected CollectionField for %s' % key)
+                elif not isinstance(field, fields.EntityField):
+                    raise KeyError('Expected EntityField for %s' % key)
+                else:
+                    entity = field.type
+        return steps
+
+    def _traverse(self, lines, indent, namespace, empty):
+        """
+        Add lines that append each value at the end of a wildcard path
+        to ``result``.
+
+        :param empty: The statement for soaked empty values outside of a loop
+        """
+        lines.append('%svalue = entity' % indent)
+        for i, (key, name, field, soak) in enumerate(self.steps):
+            if name == '*':
+                item = namespace.var('item')
+                lines.append('%sfor %s in value:' % (indent, item))
+                indent += '    '
+                lines.append('%svalue = %s' % (indent, item))
+                empty = 'continue'
+            else:
+                lines.append('%svalue = %s' % (indent, attribute('value', name)))
+
+            if i < len(self.steps) - 1:
+                if self.steps[i + 1][1] == '*':
+                    # An empty collection has no items, only None is empty
+                    lines.append('%sif value is None:' % indent)
+                else:
+                    lines.append('%sif not value:' % indent)
+                if soak:
+                    lines.append('%s    %s' % (indent, empty))
+                else:
+                    lines.append('%s    raise ValueError(%r)' % (indent, '%s is empty' % key))
+        lines.append('%sresult.append(value)' % indent)
+
+    def _compile_gather(self):
+        namespace = Namespace()
+        lines = ['def gather(entities):', '    result = []', '    for entity in entities:']
+        self._traverse(lines, '        ', namespace, 'continue')
+        lines.append('    return result')
+        return compile_function('gather', lines, namespace, '<springfield path %r>' % self.target)
+
+    def _compile_get(self):
+        namespace = Namespace(Empty=Empty)
+        if self.wildcard:
+            lines = ['def get(entity):', '    result = []']
+            self._traverse(lines, '    ', namespace, 'return result')
+            lines.append('    return result')
+            return compile_function('get', lines, namespace, '<springfield path %r>' % self.target)
+
+        lines = ['def get(entity):', '    value = entity']
+        for key, name, field, soak in self.steps[:-1]:
+            lines.append('    value = %s' % attribute('value', name))
+            lines.append('    if not value:')
+            if soak:
+                lines.append('        return Empty')
+            else:
+                lines.append('        raise ValueError(%r)' % ('%s is empty' % key))
+        lines.append('    return %s' % attribute('value', self.steps[-1][1]))
+        return compile_function('get', lines, namespace, '<springfield path %r>' % self.target)
+
+    def _compile_set(self):
+        namespace = Namespace()
+        if self.wildcard:
+            lines = [
+                'def set(entity, value):',
+                # Like any key that can't be set, so loading values ignores it
+                '    raise KeyError(%r)' % ('Can not set wildcard path %s' % self.target),
+            ]
+            return compile_function('set', lines, namespace, '<springfield path %r>' % self.target)
+
+        lines = ['def set(entity, value):', '    pos = entity']
+        for key, name, field, soak in self.steps[:-1]:
+            lines.extend([
+                '    if not %s:' % attribute('pos', name),
+                # Create a new Entity instance
+                '        %s' % set_attribute('pos', name, '%s()' % namespace.add(field.type, 'type')),
+                '    pos = %s' % attribute('pos', name),
+            ])
+        lines.append('    %s' % set_attribute('pos', self.steps[-1][1], 'value'))
+        return compile_function('set', lines, namespace, '<springfield path %r>' % self.target)
@@ -0,0 +1,130 @@
+"""
+Decode-time field projections.
+
+A projection is a list of dot notation paths, like
+``['id', 'owner.name', 'items.*.sku']``, of the fields to load from
+a `dict`. ``*`` selects every item of a :class:`CollectionField`. Fields
+outside the projection are never adapted or stored::
+
+    user = User.from_json(data, only=['id', 'owner.name'])
+"""
+from springfield import fields
+
+
+def get_projection(entity, only):
+    """
+    Get the :class:`Projection` of `only` from the cache of the
+    :class:`Entity` class `entity`, compiling it if needed.
+    """
+    key = frozenset(only)
+    projection = entity.__projections__.get(key)
+    if projection is None:
+        projection = entity.__projections__[key] = Projection(entity, key)
+    return projection
+
+
+def _resolve(entity, target):
+    """
+    Check that each step of `target` is a field and get the step names.
+    """
+    names = target.split('.')
+    field = None
+    for i, name in enumerate(names):
+        key = '.'.join(names[:i + 1])
+        if name == '*':
+            if not isinstance(field, fields.CollectionField):
+                raise KeyError('Expected CollectionField for %s' % key)
+            field = field.field
+            continue
+
+        if field is not None:
+            if not isinstance(field, fields.EntityField):
+                raise KeyError('Expected EntityField for %s' % key)
+            entity = field.type
+        if name not in entity.__fields__:
+            raise KeyError(key)
+        field = entity.__fields__[name]
+    return names
+
+
+def _build_tree(entity, only):
+    """
+    Merge the paths of `only` into nested dicts where ``True`` keeps
+    the whole value.
+    """
+    tree = {}
+    for target in only:
+        names = _resolve(entity, target)
+        node = tree
+        for name in names[:-1]:
+            child = node.get(name)
+            if child is True:
+                break
+            if child is None:
+                child = node[name] = {}
+            node = child
+        else:
+            node[names[-1]] = True
+    return tree
+
+
+def _compile_node(node):
+    """
+    Build a function that copies the projected parts of a value.
+    """
+    if '*' in node:
+        project_item = _compile_value(node['*'])
+
+        def project_items(value):
+            if isinstance(value, (list, tuple)):
+                return [project_item(item) for item in value]
+            return value
+        return project_items
+
+    keys = [(name, _compile_value(child)) for name, child in node.items()]
+
+    def project_dict(value):
+        if not isinstance(value, dict):
+            # Already adapted
+            return value
+        result = {}
+        for name, project in keys:
+            if name in value:
+                result[name] = value[name] if project is None else project(value[name])
+        return result
+    return project_dict
+
+
+def _compile_value(child):
+    if child is True:
+        return None
+    return _compile_node(child)
+
+
+class Projection(object):
+    """
+    A compiled projection of the fields of an :class:`Entity` class.
+
+    Use :meth:`Entity.projection` or :func:`get_projection` to get a cached
+    :class:`Projection` for a class.
+    """
+    def __init__(self, entity, only):
+        """
+        :param entity: The :class:`Entity` class to load
+        :param only: Dot notation paths of the fields to load
+        :raises KeyError: If a field along a path does not exist
+        """
+        self.entity = entity
+        self.only = frozenset(only)
+
+        #: ``filter(data)`` gets a `dict` with only the projected parts of `data`
+        self.filter = _compile_node(_build_tree(entity, self.only))
+
+    def __repr__(self):
+        return '<Projection %s %r>' % (self.entity.__name__, sorted(self.only))
+
+    def load(self, data):
+        """
+        Create an entity from the projected parts of the `dict` `data`.
+        """
+        return self.entity(**self.filter(data))
@@ -0,0 +1,147 @@
+"""
+Share batches of entities between processes through shared memory.
+
+:class:`SharedBatch` packs entities of one class into a block of
+`multiprocessing.shared_memory` in the :mod:`springfield.columnar` format.
+The handle only pickles as the name of the block, so sending it to a
+worker is cheap, and workers read rows through views of the block instead
+of unpickling every entity::
+
+    def total_age(handle):
+        with handle.attach() as batch:
+            return int(sum(row.age for row in batch))
+
+    with SharedBatch.create(User, users) as handle, ProcessPoolExecutor() as executor:
+        chunks = [handle[i:i + 1000] for i in range(0, len(handle), 1000)]
+        total = sum(executor.map(total_age, chunks))
+
+Requires Python 3.8 or later.
+"""
+from __future__ import absolute_import
+
+import sys
+
+from springfield import columnar
+from springfield.batch import EntityBatch
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        # The process that created the block unlinks it
+        return shared_memory.SharedMemory(name, track=False)
+    return shared_memory.SharedMemory(name)
+
+
+class SharedBatch(object):
+    """
+    A handle to a batch of entities in shared memory.
+
+    Use :meth:`create` to pack entities, :meth:`attach` in workers to read
+    them and :meth:`unlink`, or the handle as a context manager, in the
+    creating process to free the memory.
+    """
+    def __init__(self, entity, name, nbytes, size, rows=None):
+        """
+        :param entity: The :class:`Entity` class of the rows
+        :param name: The name of the shared memory block
+        :param nbytes: The size of the packed batch
+        :param size: The number of rows
+        :param rows: A `slice` of the rows to read, or ``None`` for every row
+        """
+        self.entity = entity
+        self.name = name
+        self.nbytes = nbytes
+        self.size = size
+        self.rows = rows
+        self._memory = None
+
+    @classmethod
+    def create(cls, entity, entities):
+        """
+        Pack entities into a new shared memory block.
+
+        :param entity: The :class:`Entity` class of the rows
+        :param entities: Instances of `entity`, or an :class:`EntityBatch`
+        :raises ImportError: If `multiprocessing.shared_memory` isn't available
+        """
+        if shared_memory is None:
+            raise ImportError('SharedBatch requires multiprocessing.shared_memory, added in Python 3.8')
+
+        batch = entities if isinstance(entities, EntityBatch) else EntityBatch.from_entities(entity, entities)
+        nbytes = columnar.packed_size(batch)
+        memory = shared_memory.SharedMemory(create=True, size=nbytes)
+        try:
+            columnar.pack_into(batch, memory.buf)
+        except Exception:
+            memory.close()
+            memory.unlink()
+            raise
+
+        handle = cls(entity, memory.name, nbytes, len(batch))
+        handle._memory = memory
+        return handle
+
+    def attach(self):
+        """
+        Read the batch from shared memory without copying it. Close the
+        batch, or use it as a context manager, to detach.
+
+        :returns: A :class:`springfield.columnar.ColumnarBatch` of the rows
+        """
+        memory = _attach(self.name)
+        try:
+            batch = columnar.read(memory.buf[:self.nbytes], self.entity, memory)
+        except Exception:
+            memory.close()
+            raise
+        if self.rows is not None:
+            columns = dict((name, column.take(self.rows)) for name, column in batch.columns.items())
+            batch = columnar.ColumnarBatch(self.entity, columns, len(self), batch.buffer, memory)
+        return batch
+
+    def unlink(self):
+        """
+        Free the shared memory. Only call this in the process that created
+        the batch, once workers are done with it.
+        """
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+    def __len__(self):
+        if self.rows is None:
+            return self.size
+        return len(range(*self.rows.indices(self.size)))
+
+    def __getitem__(self, rows):
+        """
+        Get a handle to a slice of the rows, such as a chunk for one worker.
+        """
+        if not isinstance(rows, slice):
+            raise TypeError('SharedBatch can only be sliced')
+        if self.rows is not None:
+            selected = range(*self.rows.indices(self.size))[rows]
+            stop = selected.stop if selected.stop >= 0 else None
+            rows = slice(selected.start, stop, selected.step)
+        return SharedBatch(self.entity, self.name, self.nbytes, self.size, rows)
+
+    def __getstate__(self):
+        # The memory is only owned by the process that created it
+        state = self.__dict__.copy()
+        state['_memory'] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.unlink()
+
+    def __repr__(self):
+        return '<SharedBatch %s x %d %s>' % (self.entity.__name__, len(self), self.name)
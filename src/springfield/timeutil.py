@@ -2,81 +2,184 @@
 
 from datetime import timedelta, tzinfo, datetime
 import re
+import sys
 
 try:
-    import itertools.imap as map
+    from datetime import timezone as _timezone
 except ImportError:
-    pass
+    # Python 2
+    _timezone = None
 
-try:
-    # Try to use pytz if it exists
-    from pytz import utc
-except ImportError:
-    # Fallback to simple UTC implementation
-
-    class _UtcOffset(tzinfo):
+    class _FixedOffset(tzinfo):
         """
-        Simple UTC tzinfo
+        Simple fixed offset tzinfo
         """
-        def __init__(self):
-            self._offset = timedelta(0)
-            self._name = 'UTC'
+        def __init__(self, offset):
+            self._offset = offset
 
         def utcoffset(self, dt):
             return self._offset
 
         def tzname(self, dt):
-            return self._name
+            return None
 
         def dst(self, dt):
-            return self._offset
-
-        def __str__(self):
-            return self._name
+            return timedelta(0)
 
         def __repr__(self):
-            return self._name
+            return '<UTC%+d:%02d>' % divmod(self._offset.days * 1440 + self._offset.seconds // 60, 60)
+
+
+# Always defined, since older versions pickled it as the `tzinfo` of every
+# date-time
+class _UtcOffset(tzinfo):
+    """
+    Simple UTC tzinfo
+    """
+    def __init__(self):
+        self._offset = timedelta(0)
+        self._name = 'UTC'
+
+    def utcoffset(self, dt):
+        return self._offset
 
-    #: A :class:`tzinfo` for UTC
-    utc = _UtcOffset()
+    def tzname(self, dt):
+        return self._name
+
+    def dst(self, dt):
+        return self._offset
+
+    def __str__(self):
+        return self._name
+
+    def __repr__(self):
+        return self._name
 
 try:
-    from dateutil.parser import parse as date_parse
+    # Try to use pytz if it exists
+    from pytz import utc
 except ImportError:
-    import re
-    def date_parse(date):
-        """
-        Parse an RFC3339 formatted time string into a datetime object.
-
-        Assumes input is UTC.
-        """
-        return datetime(*map(int, re.split(r'[^\d]', date)[:-1])).replace(tzinfo=utc)
+    if _timezone is not None:
+        #: A :class:`tzinfo` for UTC
+        utc = _timezone.utc
+    else:
+        # Fallback to simple UTC implementation
+        utc = _UtcOffset()
 
 try:
-    from pyrfc3339 import generate as _generate
-    def generate_rfc3339(value):
-        """
-        Converts a datetime to an RFC3339 formatted time string
+    from dateutil.parser import parse as _lenient_parse
+except ImportError:
+    _lenient_parse = None
 
-        :param value: A :class:`datetime` instance
-        """
-        return _generate(value, accept_naive=True)
+# `fromisoformat` only supports RFC3339 from Python 3.11
+if sys.version_info >= (3, 11):
+    _fromisoformat = datetime.fromisoformat
+else:
+    _fromisoformat = None
 
-except ImportError:
-    def generate_rfc3339(value):
-        """
-        Converts a datetime to an RFC3339 formatted time string.
+# `[0-9]` rather than `\d`, which matches any Unicode digit
+_rfc3339 = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})[Tt ]([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\.([0-9]+))?'
+    r'(?:[Zz]|([+-])([0-9]{2}):([0-9]{2}))?\Z')
 
-        Input is always converted to UTC.
+#: tzinfo for the offsets that have been parsed, keyed by minutes
+_offsets = {0: utc}
 
-        :param value: A :class:`datetime` instance
-        """
-        if value.tzinfo is None:
-            value = value.replace(tzinfo=utc)
 
-        value = value.astimezone(utc)
+def _offset_tzinfo(minutes):
+    tz = _offsets.get(minutes)
+    if tz is None:
+        offset = timedelta(minutes=minutes)
+        tz = _offsets[minutes] = _timezone(offset) if _timezone else _FixedOffset(offset)
+    return tz
+
+
+def _from_match(match):
+    year, month, day, hour, minute, second, fraction, sign, offset_hour, offset_minute = match.groups()
+    microsecond = int((fraction + '00000')[:6]) if fraction else 0
+    minutes = 0
+    if sign:
+        minutes = int(offset_hour) * 60 + int(offset_minute)
+        if sign == '-':
+            minutes = -minutes
+    return datetime(
+        int(year), int(month), int(day), int(hour), int(minute), int(second), microsecond,
+        _offset_tzinfo(minutes))
+
+
+def parse_rfc3339(value):
+    """
+    Parse an RFC3339 date-time string, such as
+    ``2020-01-02T03:04:05.123+02:00``, into a datetime object.
+
+    Strings without an offset are assumed to be UTC. Fractional seconds
+    beyond microseconds are truncated.
+
+    :raises ValueError: If `value` is not an RFC3339 date-time string
+    """
+    match = _rfc3339.match(value)
+    if match is None:
+        raise ValueError('Invalid RFC3339 date-time %r' % value)
+
+    if _fromisoformat is not None:
+        try:
+            result = _fromisoformat(value)
+        except ValueError:
+            # Lower case separators or more precise fractions
+            return _from_match(match)
+        tz = result.tzinfo
+        if tz is None or (tz is not utc and not result.utcoffset()):
+            result = result.replace(tzinfo=utc)
+        return result
+
+    return _from_match(match)
+
+
+def date_parse(value, lenient=False):
+    """
+    Parse a date-time string into a datetime object.
+
+    :param value: An RFC3339 date-time string. See :func:`parse_rfc3339`.
+    :param lenient: Parse other formats with `dateutil.parser.parse`, which
+                    must be installed. Values without an offset are UTC,
+                    like RFC3339 date-times.
+    :raises ValueError: If `value` can not be parsed
+    :raises ImportError: If a `value` that isn't RFC3339 is parsed leniently
+                         without dateutil
+    """
+    try:
+        return parse_rfc3339(value)
+    except ValueError:
+        if not lenient:
+            raise
+    if _lenient_parse is None:
+        raise ImportError('dateutil is required to parse dates leniently')
+
+    result = _lenient_parse(value)
+    if result.tzinfo is None or (result.tzinfo is not utc and not result.utcoffset()):
+        result = result.replace(tzinfo=utc)
+    return result
+
+
+def generate_rfc3339(value, microseconds=False):
+    """
+    Converts a datetime to an RFC3339 formatted time string.
+
+    Input is always converted to UTC. Naive values are assumed to be UTC.
+
+    :param value: A :class:`datetime` instance
+    :param microseconds: Include microseconds
+    """
+    offset = value.utcoffset()
+    if offset:
+        value = value - offset
+
+    if microseconds:
+        return '%04d-%02d-%02dT%02d:%02d:%02d.%06dZ' % (
+            value.year, value.month, value.day, value.hour, value.minute, value.second, value.microsecond)
+    return '%04d-%02d-%02dT%02d:%02d:%02dZ' % (
+        value.year, value.month, value.day, value.hour, value.minute, value.second)
 
-        return value.strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
 
 def utcnow():
     """
@@ -0,0 +1,112 @@
+from springfield.types import Empty
+
+
+class CompactValues(list):
+    """
+    A fixed-length list of field values that can be used in place of
+    the `dict` an :class:`Entity` normally keeps its values in.
+
+    Each field has its own position in the list, fields without a value
+    hold :data:`Empty`. Use :meth:`for_fields` to create a subclass for
+    a specific set of fields.
+    """
+    __slots__ = ()
+
+    #: Map field names to their position
+    _positions = {}
+
+    #: Field names in order of position
+    _names = ()
+
+    @classmethod
+    def for_fields(cls, name, field_names):
+        """
+        Create a subclass that holds values for `field_names`.
+
+        :param name: The name of the subclass
+        :param field_names: An iterable of field names
+        """
+        names = tuple(sorted(field_names))
+        return type(name, (cls,), {
+            '__slots__': (),
+            '_positions': dict((n, i) for i, n in enumerate(names)),
+            '_names': names,
+        })
+
+    def __init__(self, values=None):
+        super(CompactValues, self).__init__([Empty] * len(self._names))
+        if values:
+            for key, value in values.items():
+                self[key] = value
+
+    def __getitem__(self, name):
+        value = list.__getitem__(self, self._positions[name])
+        if value is Empty:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        list.__setitem__(self, self._positions[name], value)
+
+    def __delitem__(self, name):
+        position = self._positions[name]
+        if list.__getitem__(self, position) is Empty:
+            raise KeyError(name)
+        list.__setitem__(self, position, Empty)
+
+    def __contains__(self, name):
+        position = self._positions.get(name)
+        return position is not None and list.__getitem__(self, position) is not Empty
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, CompactValues):
+            other = other.copy()
+        return self.copy() == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def __reduce__(self):
+        # Subclasses are created per Entity class and can't be imported
+        # by pickle, so pickle as a `dict`.
+        return dict, (self.items(),)
+
+    def get(self, name, default=None):
+        position = self._positions.get(name)
+        if position is None:
+            return default
+        value = list.__getitem__(self, position)
+        if value is Empty:
+            return default
+        return value
+
+    def keys(self):
+        return [n for n, v in zip(self._names, list.__iter__(self)) if v is not Empty]
+
+    def values(self):
+        return [v for v in list.__iter__(self) if v is not Empty]
+
+    def items(self):
+        return [(n, v) for n, v in zip(self._names, list.__iter__(self)) if v is not Empty]
+
+    iteritems = items
+
+    def clear(self):
+        list.__setitem__(self, slice(None), [Empty] * len(self._names))
+
+    def copy(self):
+        """
+        Get the values as a `dict`.
+        """
+        return dict(self.items())
@@ -0,0 +1,101 @@
+from datetime import datetime
+import pytest
+from springfield import Entity, fields
+from springfield.batch import EntityBatch
+from springfield.timeutil import utc
+
+
+class Position(Entity):
+    top = fields.IntField()
+    left = fields.IntField()
+
+
+class CountField(fields.IntField):
+    def get(self, instance, name):
+        value = super(CountField, self).get(instance, name)
+        return 0 if value is None else value
+
+
+class Sample(Entity):
+    id = fields.IntField()
+    count = CountField()
+    score = fields.FloatField()
+    active = fields.BooleanField()
+    name = fields.StringField()
+    created = fields.DateTimeField()
+    pos = fields.EntityField(Position)
+
+
+def make_samples():
+    return [
+        Sample(id=1, score=1.5, active=True, name='one', created=datetime(2020, 1, 2, 3, 4, 5, tzinfo=utc), pos={'top': 1}),
+        Sample(id=2, score=2.5, active=False, name='two', created=datetime(2021, 1, 2, tzinfo=utc)),
+        Sample(id=3, active=True),
+    ]
+
+
+def test_batch():
+    """
+    Make sure a batch round trips entities and its rows read like entities
+    """
+    samples = make_samples()
+    batch = EntityBatch.from_entities(Sample, samples)
+    assert len(batch) == 3
+    assert batch.to_entities() == samples
+
+    row = batch[0]
+    assert row.id == 1
+    assert row['pos.top'] == 1
+    assert row.created == samples[0].created
+    assert row == samples[0]
+    assert row.jsonify() == samples[0].jsonify()
+
+    row = batch[-1]
+    assert row.score is None
+    # Unset values are read like the entity reads them
+    assert row.count == samples[-1].count == 0
+    assert EntityBatch.from_entities(Sample, [Sample(count=2)])[0].count == 2
+    assert 'score' not in row
+    assert 'id' in row
+    assert sorted(row.keys()) == ['active', 'id']
+    with pytest.raises(AttributeError):
+        row.unknown
+
+    assert [r.id for r in batch[1:]] == [2, 3]
+    with pytest.raises(IndexError):
+        batch[3]
+
+
+def test_numpy_columns():
+    """
+    Make sure numeric and datetime fields are typed NumPy columns
+    """
+    numpy = pytest.importorskip('numpy')
+    batch = EntityBatch.from_entities(Sample, make_samples())
+
+    assert batch.column('id').dtype == numpy.int64
+    assert batch.column('id').sum() == 6
+    assert batch.column('active').dtype == numpy.bool_
+    # Missing values are masked
+    assert batch.column('score').sum() == 4.0
+    assert batch.column('created').dtype == numpy.dtype('datetime64[us]')
+    assert batch.column('name').dtype == object
+    assert isinstance(batch[0].id, int)
+
+
+def test_from_columns():
+    """
+    Make sure columns are adapted into a batch
+    """
+    batch = EntityBatch.from_columns(Sample, {
+        'id': ['1', '2'],
+        'score': [None, '2.5'],
+        'created': ['2020-01-02T03:04:05Z', '2020-01-02T03:04:05Z'],
+    })
+    assert batch.to_entities() == [
+        Sample(id=1, created='2020-01-02T03:04:05Z'),
+        Sample(id=2, score=2.5, created='2020-01-02T03:04:05Z'),
+    ]
+
+    with pytest.raises(KeyError):
+        EntityBatch.from_columns(Sample, {'unknown': []})
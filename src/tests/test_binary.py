@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+import pytest
+from springfield import Entity, FlexEntity, fields
+from springfield.timeutil import utc, _offset_tzinfo
+
+
+class Tag(Entity):
+    name = fields.StringField()
+
+
+class Record(Entity):
+    id = fields.IntField()
+    score = fields.FloatField()
+    active = fields.BooleanField()
+    name = fields.StringField()
+    data = fields.BytesField()
+    created = fields.DateTimeField()
+    tag = fields.EntityField(Tag)
+    tags = fields.CollectionField(fields.EntityField(Tag))
+    counts = fields.CollectionField(fields.IntField())
+    url = fields.UrlField()
+    extra = fields.Field()
+
+
+class Other(Entity):
+    id = fields.IntField()
+    name = fields.StringField()
+
+
+def test_round_trip():
+    """
+    Make sure entities round trip through bytes smaller than JSON
+    """
+    record = Record(
+        id=-300,
+        score=1.5,
+        active=True,
+        name=u'caf\xe9',
+        data=b'\x00\xff',
+        created=datetime(2020, 1, 2, 3, 4, 5, 6, tzinfo=_offset_tzinfo(-330)),
+        tag={'name': 'a'},
+        tags=[{'name': 'b'}, None],
+        counts=[1, 2 ** 70, -1],
+        url='http://example.com/',
+        extra={'a': [1]},
+    )
+    data = record.to_bytes()
+    assert len(data) < len(record.to_json())
+
+    decoded = Record.from_bytes(data)
+    assert decoded == record
+    assert decoded.created.utcoffset() == timedelta(minutes=-330)
+    assert decoded.__changes__ == record.__changes__
+    assert Record.from_bytes(memoryview(data)) == record
+    assert Record.from_bytes(bytearray(data)) == record
+
+    for created in (datetime(1960, 1, 1, 0, 0, 0, 1), datetime(2020, 1, 1, tzinfo=utc)):
+        record = Record(created=created, score=None)
+        decoded = Record.from_bytes(record.to_bytes())
+        assert decoded.created == created
+        assert decoded.created.tzinfo is created.tzinfo
+        assert 'score' in decoded and decoded.score is None
+
+    assert Record.from_bytes(Record().to_bytes()) == Record()
+
+
+def test_errors():
+    """
+    Make sure data for other classes, and values that can't be encoded, raise
+    """
+    data = Other(id=1).to_bytes()
+    with pytest.raises(ValueError):
+        Record.from_bytes(data)
+    with pytest.raises(ValueError):
+        Other.from_bytes(b'{}')
+    with pytest.raises(ValueError):
+        Other.from_bytes(data + b'\x00')
+
+    class SubTag(Tag):
+        pass
+
+    # Subclasses are encoded as JSON of the field
+    record = Record(tag=SubTag(name='a'), tags=[SubTag(name='b')])
+    assert Record.from_bytes(record.to_bytes()) == Record(tag={'name': 'a'}, tags=[{'name': 'b'}])
+
+    # Corrupt data
+    data = Record(id=1, name='abc', tag={'name': 'a'}, counts=[1, 2]).to_bytes()
+    for end in range(len(data)):
+        with pytest.raises(ValueError):
+            Record.from_bytes(data[:end])
+    for i in range(7, len(data)):
+        corrupt = bytearray(data)
+        corrupt[i] ^= 0xff
+        try:
+            Record.from_bytes(corrupt)
+        except ValueError:
+            pass
+
+    class Flex(FlexEntity):
+        id = fields.IntField()
+
+    flex = Flex(id=1)
+    assert Flex.from_bytes(flex.to_bytes()) == flex
+    flex.other = 1
+    with pytest.raises(TypeError):
+        flex.to_bytes()
@@ -0,0 +1,88 @@
+from datetime import datetime
+import io
+import pytest
+from springfield import Entity, columnar, fields
+from springfield.batch import EntityBatch
+from springfield.timeutil import utc
+
+
+class Tag(Entity):
+    name = fields.StringField()
+
+
+class Row(Entity):
+    id = fields.IntField()
+    score = fields.FloatField()
+    active = fields.BooleanField()
+    name = fields.StringField()
+    data = fields.BytesField()
+    created = fields.DateTimeField()
+    tag = fields.EntityField(Tag)
+
+
+ROWS = [
+    Row(id=1, score=1.5, active=True, name=u'caf\xe9', data=b'\x00', created=datetime(2020, 1, 2, tzinfo=utc), tag={'name': 'a'}),
+    Row(id=2, name='', created=datetime(2021, 1, 2, 3, 4, 5, 6, tzinfo=utc)),
+    Row(id=2 ** 70, active=False),
+]
+
+
+def test_columnar():
+    """
+    Make sure batches round trip through the columnar format
+    """
+    batch = EntityBatch.from_entities(Row, ROWS)
+    aware = dict((name, column.aware) for name, column in batch.columns.items())
+    data = columnar.dumps(batch)
+    # Writing doesn't change the batch
+    assert dict((name, column.aware) for name, column in batch.columns.items()) == aware
+    fp = io.BytesIO()
+    columnar.write(batch, fp)
+    assert fp.getvalue() == data
+    assert columnar.packed_size(batch) == len(data)
+    buf = bytearray(len(data) + 3)
+    assert columnar.pack_into(batch, buf) == len(data)
+    assert bytes(buf[:len(data)]) == data
+    with pytest.raises(ValueError):
+        columnar.pack_into(batch, bytearray(len(data) - 1))
+
+    batch = columnar.read(data, Row)
+    assert len(batch) == 3
+    assert batch.to_entities() == ROWS
+    assert batch[0].name == u'caf\xe9'
+    assert batch[1].name == ''
+    assert 'score' not in batch[1]
+    assert batch[1:].to_entities() == ROWS[1:]
+    assert batch[::2].to_entities() == ROWS[::2]
+
+    with pytest.raises(ValueError):
+        columnar.read(data, Tag)
+    with pytest.raises(ValueError):
+        columnar.read(b'{}', Row)
+
+
+def test_open_file(tmpdir):
+    """
+    Make sure files are memory-mapped with columns that are views
+    """
+    path = str(tmpdir.join('rows.sfc'))
+    with open(path, 'wb') as fp:
+        columnar.write(EntityBatch.from_entities(Row, ROWS), fp)
+
+    with columnar.open_file(path, Row) as batch:
+        assert batch.to_entities() == ROWS
+        assert isinstance(batch.buffer, columnar.mmap.mmap)
+        assert batch.column('active')[0]
+    assert batch.columns == {}
+
+
+def test_numpy_columns():
+    """
+    Make sure fixed-width columns are NumPy arrays of the buffer
+    """
+    numpy = pytest.importorskip('numpy')
+    batch = columnar.read(columnar.dumps(EntityBatch.from_entities(Row, ROWS)), Row)
+    assert batch.columns['active'].values.dtype == numpy.bool_
+    assert batch.columns['created'].values.dtype == numpy.dtype('datetime64[us]')
+    assert not batch.columns['active'].values.flags.owndata
+    assert batch.column('score').sum() == 1.5
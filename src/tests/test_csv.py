@@ -0,0 +1,98 @@
+import io
+import pytest
+from springfield import Entity, FlexEntity, fields, csv
+
+
+class Position(Entity):
+    top = fields.IntField()
+    left = fields.IntField()
+
+
+class Row(Entity):
+    id = fields.IntField()
+    name = fields.StringField()
+    active = fields.BooleanField()
+    pos = fields.EntityField(Position)
+
+
+DATA = u'''id,name,unknown,active,pos.top,pos.left
+1,one,x,yes,10,20
+2,,x,no,,
+3,three
+'''
+
+
+def test_read():
+    """
+    Make sure CSV rows load like `Entity(**row)`
+    """
+    rows = list(csv.read(io.StringIO(DATA), Row, skip_empty=True))
+    assert rows[0] == Row(id=1, name='one', active=True, pos={'top': 10, 'left': 20})
+    assert rows[0].__changes__ == set(['id', 'name', 'active', 'pos'])
+    assert 'name' not in rows[1]
+    assert rows[1].pos is None
+    # Missing cells are left unset
+    headers = ['id', 'name', 'unknown', 'active', 'pos.top', 'pos.left']
+    assert rows[2] == Row(**dict(zip(headers, ['3', 'three'])))
+    assert rows[2].__changes__ == set(['id', 'name'])
+    assert rows[2].pos is None
+
+    body = DATA.split(u'\n', 1)[1]
+    rows = list(Row.from_csv(io.StringIO(body), headers=['id', 'name']))
+    assert rows[1].name == ''
+
+    with pytest.raises(ValueError):
+        # Empty strings can't be adapted to an int
+        list(Row.from_csv(io.StringIO(DATA)))
+
+    with pytest.raises(KeyError):
+        list(csv.read(io.StringIO(DATA), Row, ignore_unknown=False))
+
+
+class Audited(Entity):
+    name = fields.StringField()
+
+    def __setattr__(self, name, value):
+        if name == 'name' and value is not None:
+            value = value.upper()
+        super(Audited, self).__setattr__(name, value)
+
+
+class Flex(FlexEntity):
+    id = fields.IntField()
+
+
+def test_constructor_fallback():
+    """
+    Make sure classes without a compiled loader load rows like their constructor
+    """
+    assert [a.name for a in csv.read(io.StringIO(u'name\nbob\n'), Audited)] == ['BOB']
+
+    flex = list(csv.read(io.StringIO(u'id,other\n1,x\n2,\n3\n'), Flex, skip_empty=True))
+    assert [(f.id, f.other) for f in flex] == [(1, 'x'), (2, None), (3, None)]
+    assert 'other' not in flex[2]
+
+    with pytest.raises(KeyError):
+        list(csv.read(io.StringIO(u'name,other\nbob,x\n'), Audited, ignore_unknown=False))
+    assert list(csv.read(io.StringIO(u'id,other\n1,x\n'), Flex, ignore_unknown=False))[0].other == 'x'
+
+
+class Bookmark(Entity):
+    uri = fields.StringField()
+
+
+class User(Entity):
+    name = fields.StringField()
+    bookmarks = fields.CollectionField(fields.EntityField(Bookmark))
+
+
+def test_wildcard_header():
+    """
+    Make sure wildcard paths are ignored like other unknown columns
+    """
+    users = list(csv.read(io.StringIO(u'name,bookmarks.*.uri\na,http://a.com\n'), User))
+    assert users == [User(**{'name': 'a', 'bookmarks.*.uri': 'http://a.com'})]
+    assert users[0].bookmarks is None
+
+    with pytest.raises(KeyError):
+        csv.compile_row_loader(User, ['name', 'bookmarks.*.uri'], ignore_unknown=False)
@@ -1,5 +1,8 @@
-from springfield.timeutil import date_parse, generate_rfc3339, utcnow
-from datetime import timedelta
+import pickle
+import pytest
+from springfield import fields, timeutil
+from springfield.timeutil import date_parse, generate_rfc3339, parse_rfc3339, utc, utcnow
+from datetime import datetime, timedelta
 
 def test_rfc3339():
     """
@@ -22,4 +25,76 @@ def test_rfc3339():
     # `generate_rfc3339` does not convert microseconds so we can't compare them
     odt = n.replace(microsecond=0)
 
-    assert dt == odt
\ No newline at end of file
+    assert dt == odt
+
+@pytest.mark.parametrize('fromisoformat', [True, False])
+def test_parse_rfc3339(monkeypatch, fromisoformat):
+    """
+    Make sure offsets, `Z` and fractional seconds are parsed
+    """
+    if not fromisoformat:
+        monkeypatch.setattr(timeutil, '_fromisoformat', None)
+
+    expected = datetime(2020, 1, 2, 1, 4, 5, 123000, tzinfo=utc)
+    assert parse_rfc3339('2020-01-02T03:04:05.123+02:00') == expected
+    assert parse_rfc3339('2020-01-02T01:04:05.123Z') == expected
+    assert parse_rfc3339('2020-01-02t01:04:05.1230009z') == expected
+    assert parse_rfc3339('2020-01-01T22:34:05.123-02:30') == expected
+    assert parse_rfc3339('2020-01-02 01:04:05.123') == expected
+    assert parse_rfc3339('2020-01-02T01:04:05Z').tzinfo is utc
+
+    for value in ['2020-01-02', '2020-01-02T01:04Z', '2020-13-02T01:04:05Z', 'Jan 2 2020']:
+        with pytest.raises(ValueError):
+            parse_rfc3339(value)
+        with pytest.raises(ValueError):
+            date_parse(value)
+
+
+def test_generate_rfc3339():
+    value = datetime(2020, 1, 2, 3, 4, 5, 123456, tzinfo=parse_rfc3339('2020-01-02T03:04:05+02:00').tzinfo)
+    assert generate_rfc3339(value) == '2020-01-02T01:04:05Z'
+    assert generate_rfc3339(value, microseconds=True) == '2020-01-02T01:04:05.123456Z'
+    assert generate_rfc3339(datetime(99, 1, 2)) == '0099-01-02T00:00:00Z'
+
+
+def test_non_ascii_digits():
+    with pytest.raises(ValueError):
+        parse_rfc3339(u'\u0662020-01-02T01:04:05Z')
+
+
+def test_lenient():
+    # RFC3339 date-times don't need dateutil
+    assert date_parse('2020-01-02T00:00:00Z', lenient=True) == datetime(2020, 1, 2, tzinfo=utc)
+    if timeutil._lenient_parse is None:
+        with pytest.raises(ImportError):
+            fields.DateTimeField(lenient=True)
+    pytest.importorskip('dateutil')
+
+    assert date_parse('Jan 2 2020', lenient=True) == datetime(2020, 1, 2, tzinfo=utc)
+    assert date_parse('Jan 2 2020 00:00 UTC', lenient=True).tzinfo is utc
+    assert date_parse('Jan 2 2020 02:00 +0200', lenient=True) == datetime(2020, 1, 2, tzinfo=utc)
+    assert fields.DateTimeField(lenient=True).adapt('Jan 2 2020').tzinfo is utc
+
+
+# Pickles of `datetime(2020, 1, 2, 3, 4, 5, 6, tzinfo=utc)` by springfield 0.9.1
+# without pytz, with protocols 0 and 2
+LEGACY_PICKLES = [
+    b'cdatetime\ndatetime\np0\n(c_codecs\nencode\np1\n(V\x07\xe4\x01\x02\x03\x04\x05\\u0000\\u0000\x06\np2\n'
+    b'Vlatin1\np3\ntp4\nRp5\ncspringfield.timeutil\n_UtcOffset\np6\n(tRp7\n(dp8\nV_offset\np9\ncdatetime\n'
+    b'timedelta\np10\n(I0\nI0\nI0\ntp11\nRp12\nsV_name\np13\nVUTC\np14\nsbtp15\nRp16\n.',
+    b'\x80\x02cdatetime\ndatetime\nq\x00c_codecs\nencode\nq\x01X\x0b\x00\x00\x00\x07\xc3\xa4\x01\x02\x03\x04'
+    b'\x05\x00\x00\x06q\x02X\x06\x00\x00\x00latin1q\x03\x86q\x04Rq\x05cspringfield.timeutil\n_UtcOffset\nq\x06'
+    b')Rq\x07}q\x08(X\x07\x00\x00\x00_offsetq\tcdatetime\ntimedelta\nq\nK\x00K\x00K\x00\x87q\x0bRq\x0cX\x05\x00'
+    b'\x00\x00_nameq\rX\x03\x00\x00\x00UTCq\x0eub\x86q\x0fRq\x10.',
+]
+
+
+@pytest.mark.parametrize('data', LEGACY_PICKLES)
+def test_legacy_pickle(data):
+    """
+    Make sure date-times pickled with the old UTC tzinfo still load
+    """
+    value = pickle.loads(data)
+    assert value == datetime(2020, 1, 2, 3, 4, 5, 6, tzinfo=utc)
+    assert value.utcoffset() == timedelta(0)
+    assert pickle.loads(pickle.dumps(value)) == value
@@ -1,4 +1,5 @@
 from springfield import Entity, FlexEntity, fields, Empty
+from springfield.alias import Alias
 import pytest
 
 class PositionEntity(Entity):
@@ -78,3 +79,81 @@ def test_dot_notation():
     assert e2.child.pos.left == 67    
 
 
+
+
+def test_compiled_paths():
+    path = ExampleTestEntity.path('child?.pos.top')
+    assert path is ExampleTestEntity.path('child?.pos.top')
+    assert path.field is PositionEntity.__fields__['top']
+
+    e = ExampleTestEntity()
+    assert path.get(e) is Empty
+
+    path.set(e, '5')
+    assert e.child.pos.top == 5
+    assert path.get(e) == 5
+
+    with pytest.raises(KeyError):
+        ExampleTestEntity.path('id.foo')
+
+
+def test_alias():
+    class AliasTestEntity(ExampleTestEntity):
+        top = Alias('child.pos.top')
+        title = Alias('name')
+
+    e = AliasTestEntity(title='foo', top=3)
+    assert e.name == 'foo'
+    assert e.title == 'foo'
+    assert e.child.pos.top == 3
+    assert e.top == 3
+    assert e.jsonify() == {'name': 'foo', 'child': {'pos': {'top': 3}}}
+
+
+class Bookmark(Entity):
+    uri = fields.UrlField()
+    visits = fields.IntField()
+    tags = fields.CollectionField(fields.StringField)
+
+
+class User(Entity):
+    name = fields.StringField()
+    bookmarks = fields.CollectionField(fields.EntityField(Bookmark))
+
+
+def test_wildcard_paths():
+    """
+    Make sure `*` gets the values of every item of a collection
+    """
+    users = [
+        User(bookmarks=[
+            {'uri': 'http://a.com', 'visits': 1, 'tags': ['x', 'y']},
+            {'uri': 'http://b.com', 'visits': 2},
+        ]),
+        User(bookmarks=[]),
+        User(bookmarks=[{'uri': 'http://c.com', 'visits': 3, 'tags': ['z']}]),
+    ]
+    assert users[0]['bookmarks.*.uri'] == ['http://a.com', 'http://b.com']
+    assert users[1]['bookmarks.*.uri'] == []
+
+    path = User.path('bookmarks.*.tags?.*')
+    assert path.get(users[0]) == ['x', 'y']
+    assert path.gather(users) == ['x', 'y', 'z']
+    assert list(User.path('bookmarks.*.visits').gather(users)) == [1, 2, 3]
+
+    with pytest.raises(ValueError):
+        User.path('bookmarks.*.tags.*').get(users[0])
+    with pytest.raises(ValueError):
+        User.path('bookmarks.*.uri').get(User())
+    assert User.path('bookmarks?.*.uri').get(User()) == []
+
+    with pytest.raises(KeyError):
+        users[0]['bookmarks.*.uri'] = 'http://d.com'
+    # Loading values ignores wildcard paths like other unknown keys
+    user = User(name='a', **{'bookmarks.*.uri': 'http://d.com'})
+    user.update({'bookmarks.*.uri': 'http://d.com', 'name': 'b'})
+    assert user.name == 'b'
+    assert user.bookmarks is None
+    for target in ('name.*', 'bookmarks.uri', '*.uri'):
+        with pytest.raises(KeyError):
+            User.path(target)
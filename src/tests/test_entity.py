@@ -1,4 +1,7 @@
+import io
+import pickle
 from springfield import Entity, FlexEntity, fields
+from springfield.fields import AdaptManyError, LazyValue
 import pytest
 
 
@@ -65,3 +68,170 @@ def test_entity_field():
 
     e = TestEntity(sub=dict(id='2'))
     assert e.sub.id == 2
+
+
+def test_compiled_loader():
+    """
+    Assure that compiled loaders behave like loading values one by one
+    """
+    class SubEntity(Entity):
+        id = fields.IntField()
+
+    class TestEntity(Entity):
+        id = fields.IntField()
+        name = fields.StringField()
+        sub = fields.EntityField(SubEntity)
+
+    class UncompiledTestEntity(TestEntity):
+        __compiled__ = False
+
+    assert TestEntity.__load__ is not None
+    assert UncompiledTestEntity.__load__ is None
+    assert FlexEntity.__load__ is None
+
+    values = {'id': '1', 'name': None, 'sub.id': '2', 'unknown': 'x'}
+    e = TestEntity(**values)
+    e2 = UncompiledTestEntity(**values)
+
+    assert e.__values__ == e2.__values__
+    assert e.__changes__ == e2.__changes__ == set(['id', 'sub'])
+    assert e.id == 1
+    assert e.name is None
+    assert e.sub.id == 2
+
+    e.update({'id': 1, 'name': 'foo'})
+    assert e.__changes__ == set(['id', 'sub', 'name'])
+
+    with pytest.raises(ValueError):
+        TestEntity(id='foo')
+
+
+def test_change_tracking():
+    class TestEntity(Entity):
+        id = fields.IntField()
+        name = fields.StringField()
+
+    class UntrackedTestEntity(TestEntity):
+        __track_changes__ = False
+
+    e = TestEntity()
+    assert e.__changeset__ is None
+    assert e.__changes__ == set()
+
+    e = TestEntity(id=1)
+    e.name = 'foo'
+    assert e.__changes__ == set(['id', 'name'])
+
+    e = UntrackedTestEntity(id=1, **{'name': 'foo'})
+    e.id = 2
+    assert e.id == 2
+    assert e.__changeset__ is None
+    assert e.__changes__ == set()
+
+
+
+class Point(Entity):
+    x = fields.IntField()
+
+
+class Shape(Entity):
+    center = fields.EntityField(Point, lazy=True)
+    points = fields.CollectionField(fields.EntityField(Point), lazy=True)
+
+
+def test_lazy_fields():
+    """
+    Make sure lazy fields keep raw values until they are read
+    """
+    raw = {'x': '1'}
+    shape = Shape(center=raw, points=[raw, {'x': 2}])
+    assert type(shape.__values__['center']) is LazyValue
+    assert shape.__changes__ == set(['center', 'points'])
+
+    # Untouched raw values are reused
+    assert shape.jsonify()['center'] is raw
+    assert shape.flatten()['points'] == [raw, {'x': 2}]
+    out = io.StringIO()
+    shape.dump_json(out)
+    assert out.getvalue() == shape.to_json()
+
+    assert shape.center == Point(x=1)
+    assert shape.center is shape.center
+    assert shape.jsonify()['center'] == {'x': 1}
+    assert type(shape.__values__['points']) is LazyValue
+    assert shape['points'][1].x == 2
+
+    assert Shape(center=raw) == Shape(center=Point(x=1))
+    assert pickle.loads(pickle.dumps(Shape(center=raw))).center == Point(x=1)
+
+    with pytest.raises(ValueError):
+        fields.CollectionField(fields.EntityField(Point, lazy=True))
+
+
+class Label(Entity):
+    name = fields.SlugField(cache_size=10)
+
+
+class Tagged(Entity):
+    label = fields.EntityField(Label, lazy=True)
+    labels = fields.CollectionField(fields.EntityField(Label), lazy=True)
+    slugs = fields.CollectionField(fields.SlugField(cache_size=10), lazy=True)
+
+
+class FlexTagged(FlexEntity):
+    label = fields.EntityField(Label, lazy=True)
+
+
+def test_pickle_lazy_fields():
+    """
+    Make sure lazy values pickle as their raw value and are lazy again when loaded
+    """
+    raw = {'name': 'a'}
+    for entity in (Tagged(label=raw, labels=[raw]), FlexTagged(label=raw, other=1)):
+        entity2 = pickle.loads(pickle.dumps(entity))
+        assert type(entity2.__values__['label']) is LazyValue
+        assert entity2.__values__['label'].field is type(entity).__fields__['label']
+        assert entity2.flatten() == entity.flatten()
+        assert entity2.label == Label(name='a')
+
+    # Lazy values hold their field, which may have a cache
+    value = pickle.loads(pickle.dumps(Tagged(slugs=[u'A b']).__values__['slugs']))
+    assert value.materialize() == [u'a-b']
+
+    entity = Tagged(label=raw, labels=[raw])
+    entity.labels
+    entity2 = pickle.loads(pickle.dumps(entity))
+    assert type(entity2.__values__['labels']) is LazyValue
+    assert entity2 == entity
+
+
+def test_adapt_all_executor():
+    """
+    Make sure items are adapted in order by an executor and errors have indices
+    """
+    futures = pytest.importorskip('concurrent.futures')
+    items = [{'x': i} for i in range(25)]
+    expected = [Point(x=i) for i in range(25)]
+    assert list(Point.adapt_all(items)) == expected
+
+    bad = items[:10] + [{'x': 'a'}, 5] + items[12:]
+    results = Point.adapt_all(bad)
+    assert [next(results) for i in range(10)] == expected[:10]
+    with pytest.raises(AdaptManyError) as e:
+        next(results)
+    assert e.value.indices == [10]
+
+    with futures.ThreadPoolExecutor(max_workers=2) as executor:
+        assert list(Point.adapt_all(iter(items), executor=executor, chunksize=4, max_pending=2)) == expected
+        # The keyword of earlier versions
+        assert list(Point.adapt_all(items, executor=executor, chunk_size=4)) == expected
+        assert list(Point.adapt_all([], executor=executor)) == []
+
+    with futures.ProcessPoolExecutor(max_workers=2) as executor:
+        assert list(Point.adapt_all(items, executor=executor, chunksize=4)) == expected
+
+        results = Point.adapt_all(bad, executor=executor, chunksize=4)
+        assert [next(results) for i in range(8)] == expected[:8]
+        with pytest.raises(AdaptManyError) as e:
+            next(results)
+        assert e.value.indices == [10, 11]
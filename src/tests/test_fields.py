@@ -1,3 +1,4 @@
+import pickle
 import pytest
 from codecs import decode, encode
 from six import text_type
@@ -212,3 +213,162 @@ def test_stringfield_return_text_type():
     """
     stringify = fields.StringField().adapt
     assert isinstance(stringify("Hello World"), text_type)
+
+
+def test_conversions_skip_generic_adapters(monkeypatch):
+    """
+    Assure that common conversions don't fall back to generic adapters
+    and invalid values still fail the same way
+    """
+    def fail(value, to_cls):
+        raise AssertionError('Generic adapter used for %r' % (value,))
+
+    monkeypatch.setattr(fields, 'adapt', fail)
+
+    assert fields.IntField().adapt('12') == 12
+    assert fields.IntField().adapt(3.0) == 3
+    assert fields.FloatField().adapt('1.5') == 1.5
+    assert fields.BooleanField().adapt('Off') is False
+    assert fields.BytesField(encoding='hex').adapt(u'00ff') == b'\x00\xff'
+
+    with pytest.raises(ValueError):
+        fields.IntField().adapt('1.5')
+
+    with pytest.raises(TypeError):
+        fields.IntField().adapt(1.5)
+
+    with pytest.raises(TypeError):
+        fields.BooleanField().adapt('frag')
+
+
+def test_adapter_cache():
+    """
+    Assure that resolved adapters are reused until a new adapter is registered
+    """
+    class Celsius(object):
+        def __init__(self, degrees):
+            self.degrees = degrees
+
+    class TemperatureField(fields.FloatField):
+        pass
+
+    field = TemperatureField()
+    with pytest.raises(TypeError):
+        field.adapt(Celsius(10))
+
+    key = (TemperatureField, float, Celsius)
+    assert key in fields._adapter_cache
+
+    TemperatureField.register_adapter(Celsius, lambda value: float(value.degrees))
+    assert key not in fields._adapter_cache
+    assert field.adapt(Celsius(10)) == 10.0
+    assert key in fields._adapter_cache
+    assert field.adapt('11') == 11.0
+
+
+def test_adapt_many():
+    """
+    Make sure `adapt_many` adapts like `adapt` and reports bad values by index
+    """
+    assert list(fields.IntField().adapt_many(['1', 2, 3.0])) == [1, 2, 3]
+    assert fields.IntField().adapt_many(['1', None]) == [1, None]
+    assert list(fields.BooleanField().adapt_many(['yes', 0])) == [True, False]
+    assert fields.SlugField().adapt_many([u'Hello World']) == [u'hello-world']
+
+    dates = fields.DateTimeField().adapt_many(['2020-01-02T03:04:05Z', None, '2020-01-02T03:04:05Z'])
+    assert dates[0] == dates[2] == fields.DateTimeField().adapt('2020-01-02T03:04:05Z')
+    assert dates[1] is None
+
+    with pytest.raises(fields.AdaptManyError) as e:
+        fields.IntField().adapt_many(['1', 'x', 2.5, 3])
+    assert e.value.indices == [1, 2]
+    assert isinstance(e.value, ValueError)
+
+    with pytest.raises(fields.AdaptManyError) as e:
+        fields.IntField().adapt_many([1, float('inf')])
+    assert e.value.indices == [1]
+    assert isinstance(e.value, TypeError)
+
+
+def test_adapt_many_numpy():
+    """
+    Make sure numeric fields return NumPy arrays and adapt arrays in bulk
+    """
+    numpy = pytest.importorskip('numpy')
+
+    result = fields.IntField().adapt_many(numpy.array([1.0, 2.0]))
+    assert result.dtype == numpy.int64
+    assert list(result) == [1, 2]
+    assert fields.FloatField().adapt_many(['1.5', 2]).dtype == numpy.float64
+    assert list(fields.BooleanField().adapt_many(numpy.array([0, 1]))) == [False, True]
+
+    with pytest.raises(fields.AdaptManyError) as e:
+        fields.IntField().adapt_many(numpy.array([1.0, 1.5, numpy.nan]))
+    assert e.value.indices == [1, 2]
+
+    # Booleans are kept like `adapt` does
+    result = fields.IntField().adapt_many(numpy.array([True, False]))
+    assert result == [True, False]
+    assert result[0] is fields.IntField().adapt(True)
+
+    # Arrays of strings, e.g. columns read from text
+    result = fields.IntField().adapt_many(numpy.array(['1', '-2']))
+    assert result.dtype == numpy.int64
+    assert list(result) == [1, -2]
+    assert list(fields.FloatField().adapt_many(numpy.array(['1.5', '2']))) == [1.5, 2.0]
+    result = fields.BooleanField().adapt_many(numpy.array(['Yes', 'off', '1']))
+    assert result.dtype == numpy.bool_
+    assert list(result) == [True, False, True]
+
+    with pytest.raises(fields.AdaptManyError) as e:
+        fields.IntField().adapt_many(numpy.array(['1', '1.5', 'x']))
+    assert e.value.indices == [1, 2]
+    with pytest.raises(fields.AdaptManyError) as e:
+        fields.BooleanField().adapt_many(numpy.array(['yes', 'maybe']))
+    assert e.value.indices == [1]
+
+
+def test_cache(monkeypatch):
+    """
+    Make sure adapted text values are cached with hit and miss statistics
+    """
+    field = fields.UrlField(cache_size=2)
+    assert field.adapt(u'HTTP://Example.com/a') == u'http://example.com/a'
+    assert field.adapt(u'HTTP://Example.com/a') == u'http://example.com/a'
+    field.adapt(u'http://b.com')
+    field.adapt(u'http://c.com')
+    assert (field.cache.hits, field.cache.misses) == (1, 3)
+    assert field.cache.hit_rate == 0.25
+    # The least recently used value was dropped
+    assert len(field.cache) == 2
+    field.adapt(u'HTTP://Example.com/a')
+    assert field.cache.misses == 4
+
+    # Errors are not cached
+    for i in range(2):
+        with pytest.raises(TypeError):
+            field.adapt(u'not a url')
+    assert field.cache.misses == 6
+
+    class Page(Entity):
+        slug = fields.SlugField(cache_size=10)
+
+    assert Page(slug=u'Hello World').slug == Page(slug=u'Hello World').slug == u'hello-world'
+    assert Page.__fields__['slug'].cache.hits == 1
+
+    assert fields.DateTimeField().cache is None
+    monkeypatch.setattr(fields, 'DEFAULT_CACHE_SIZE', 10)
+    assert fields.DateTimeField().cache.size == 10
+    assert fields.IntField().cache is None
+    # Adapting a plain string costs about as much as looking it up
+    assert fields.StringField().cache is None
+
+    for field in (fields.IntField, fields.StringField):
+        with pytest.raises(TypeError):
+            field(cache_size=10)
+
+    # Fields with a cache can be pickled, without the cached values
+    field = pickle.loads(pickle.dumps(fields.UrlField(cache_size=2)))
+    assert (field.cache.size, len(field.cache)) == (2, 0)
+    assert field.adapt(u'HTTP://Example.com/a') == field.adapt(u'HTTP://Example.com/a')
+    assert (field.cache.hits, field.cache.misses) == (1, 1)
@@ -0,0 +1,114 @@
+import io
+import json
+import pytest
+from springfield import Entity, FlexEntity, fields, jsonstream
+from springfield.timeutil import utcnow
+
+
+class Item(Entity):
+    id = fields.IntField()
+    name = fields.StringField()
+    tags = fields.CollectionField(fields.StringField)
+
+
+DOCUMENT = {
+    'skip': {'nested': [1, 2, {'a': '"]}\\\\'}], 'text': 'a \\" } ] b'},
+    'count': 123456,
+    'data': {
+        'items': [
+            {'id': i, 'name': u'item é "%d"' % i, 'tags': ['a', 'b']}
+            for i in range(50)
+        ],
+    },
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_iter_items(chunk_size):
+    """
+    Make sure elements are read correctly no matter where chunks split the document
+    """
+    text = json.dumps(DOCUMENT)
+    items = list(jsonstream.iter_items(io.StringIO(text), 'data.items', chunk_size=chunk_size, backend='python'))
+    assert items == DOCUMENT['data']['items']
+
+    data = io.BytesIO(text.encode('utf-8'))
+    items = list(jsonstream.iter_items(data, 'data.items', chunk_size=chunk_size, backend='python'))
+    assert items == DOCUMENT['data']['items']
+
+    items = list(jsonstream.iter_items(io.StringIO(u'[1, 2.5, "x"] '), chunk_size=chunk_size, backend='python'))
+    assert items == [1, 2.5, 'x']
+
+    assert list(jsonstream.iter_items(io.StringIO(u'[]'), chunk_size=chunk_size, backend='python')) == []
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3])
+def test_iter_items_split_characters(chunk_size):
+    """
+    Make sure chunks of bytes that end inside a character aren't the end of the document
+    """
+    data = io.BytesIO(u'{"skip": ["caf\xe9", "\u20ac"], "items": [1, 2]}'.encode('utf-8'))
+    assert list(jsonstream.iter_items(data, 'items', chunk_size=chunk_size, backend='python')) == [1, 2]
+
+
+@pytest.mark.parametrize('backend', ['python', 'ijson'])
+def test_iter_items_errors(backend):
+    if backend == 'ijson':
+        pytest.importorskip('ijson')
+
+    for document in (u'{"data": {}}', u'{"data": {"x": 1, "y": [2]}}', u'{"x": 1, "data": 2}', u'[]'):
+        with pytest.raises(KeyError):
+            list(jsonstream.iter_items(io.StringIO(document), 'data.items', backend=backend))
+    for document in (u'{"data": {"items": 1}}', u'{"data": {"items": {"a": [1]}}}'):
+        with pytest.raises(ValueError):
+            list(jsonstream.iter_items(io.StringIO(document), 'data.items', backend=backend))
+    assert list(jsonstream.iter_items(io.StringIO(u'{"data": {"items": []}}'), 'data.items', backend=backend)) == []
+
+    with pytest.raises(ValueError):
+        list(jsonstream.iter_items(io.StringIO(u'[{"id": 1}, {"id":'), backend='python'))
+
+
+def test_iter_json():
+    fp = io.StringIO(json.dumps(DOCUMENT))
+    entities = Item.iter_json(fp, path='data.items')
+    entity = next(entities)
+    assert isinstance(entity, Item)
+    assert entity.id == 0
+    assert len(list(entities)) == 49
+
+
+class Document(FlexEntity):
+    id = fields.IntField()
+    created = fields.DateTimeField()
+    data = fields.BytesField()
+    item = fields.EntityField(Item)
+    items = fields.CollectionField(fields.EntityField(Item))
+    empty = fields.CollectionField(fields.IntField)
+
+
+def test_dump_json():
+    """
+    Make sure the streaming writer matches `to_json`
+    """
+    document = Document(
+        id=1,
+        created=utcnow(),
+        data=b'\x00\xff',
+        item={'id': 1, 'name': u'é'},
+        items=[Item(id=2, tags=['a']), None, Item()],
+        empty=[],
+        extra={'any': [1, 'thing']},
+    )
+    document.item = None
+
+    fp = io.StringIO()
+    document.dump_json(fp, chunk_size=8)
+    assert fp.getvalue() == document.to_json()
+
+    fp = io.StringIO()
+    jsonstream.dump_json_iter((Item(id=i) for i in range(3)), fp)
+    assert json.loads(fp.getvalue()) == [{'id': 0}, {'id': 1}, {'id': 2}]
+
+    fp = io.StringIO()
+    jsonstream.dump_json_iter([], fp)
+    assert fp.getvalue() == '[]'
@@ -0,0 +1,69 @@
+import io
+import pytest
+from springfield import Entity, fields, ndjson
+
+
+class Record(Entity):
+    id = fields.IntField()
+    name = fields.StringField()
+
+
+def test_read_write():
+    records = [Record(id=i, name=u'record %d' % i) for i in range(25)]
+
+    fp = io.StringIO()
+    ndjson.write(records, fp)
+    assert fp.getvalue().count(u'\n') == 25
+
+    fp.seek(0)
+    assert list(ndjson.read(fp, Record)) == records
+
+    futures = pytest.importorskip('concurrent.futures')
+    fp.seek(0)
+    with futures.ProcessPoolExecutor(max_workers=2) as executor:
+        assert list(ndjson.read(fp, Record, executor=executor, chunk_size=4, max_pending=2)) == records
+
+
+def test_gzip(tmpdir):
+    filename = str(tmpdir.join('records.ndjson.gz'))
+    with ndjson.open_file(filename, 'w') as fp:
+        ndjson.write([Record(id=1), Record(id=2)], fp)
+
+    with ndjson.open_file(filename) as fp:
+        assert [r.id for r in ndjson.read(fp, Record)] == [1, 2]
+
+
+class Outer(object):
+    class Inner(Entity):
+        id = fields.IntField()
+
+
+def test_executor():
+    """
+    Make sure nested classes can be read by workers and pending chunks are cancelled
+    """
+    futures = pytest.importorskip('concurrent.futures')
+    assert ndjson._resolve_entity(ndjson.entity_path(Outer.Inner)) is Outer.Inner
+
+    class Local(Entity):
+        id = fields.IntField()
+
+    with pytest.raises(ValueError):
+        ndjson.entity_path(Local)
+
+    submitted = []
+
+    class Executor(futures.Executor):
+        def submit(self, fn, *args):
+            future = futures.Future()
+            submitted.append(future)
+            if len(submitted) == 1:
+                future.set_result(fn(*args))
+            return future
+
+    fp = io.StringIO(u''.join(u'{"id": %d}\n' % i for i in range(10)))
+    items = ndjson.read(fp, Outer.Inner, executor=Executor(), chunk_size=2, max_pending=3)
+    assert next(items) == Outer.Inner(id=0)
+    items.close()
+    assert len(submitted) == 3
+    assert all(future.cancelled() for future in submitted[1:])
@@ -1,5 +1,9 @@
+import io
+import json
 import pickle
-from springfield import Entity, fields
+import pytest
+from springfield import Entity, CompactEntity, fields
+from springfield.fields import StreamValue
 from springfield.timeutil import utcnow
 
 class SampleEntity(Entity):
@@ -39,6 +43,56 @@ def test_pickle():
     entity2.name = 'New name'
     assert entity2.name == 'New name'
 
+
+class LegacyPickler(pickle.Pickler):
+    # Pickles entities as a dict of values, like before `__reduce_ex__`
+    dispatch_table = {SampleEntity: lambda entity: object.__reduce_ex__(entity, 2)}
+
+
+def test_positional_pickle():
+    """
+    Make sure entities pickle as positional values and still load the `dict` format
+    """
+    entity = SampleEntity(id=1, url='http://example.com', entity_collection=[SampleEntity(id=2)])
+    pickled = pickle.dumps(entity)
+    fp = io.BytesIO()
+    LegacyPickler(fp, 2).dump(entity)
+    legacy = fp.getvalue()
+    assert len(pickled) < len(legacy)
+    assert pickle.loads(legacy) == entity
+
+    for entity in (entity, SampleEntity(), SampleEntity(slug=None, url='http://example.com')):
+        entity2 = pickle.loads(pickle.dumps(entity))
+        assert entity2 == entity
+        assert entity2.__changes__ == entity.__changes__
+
+    entity.__changes__.clear()
+    entity.__changes__.add('name')
+    entity2 = pickle.loads(pickle.dumps(entity))
+    assert entity2.__changes__ == set(['name'])
+
+
+class Versioned(Entity):
+    age = fields.IntField()
+    name = fields.StringField()
+
+
+def test_pickle_changed_fields(monkeypatch):
+    """
+    Make sure positional pickles of a class whose fields changed are rejected
+    """
+    pickled = pickle.dumps(Versioned(age=30, name='bob'))
+
+    class Versioned2(Entity):
+        age = fields.IntField()
+        email = fields.StringField()
+        name = fields.StringField()
+
+    Versioned2.__qualname__ = 'Versioned'
+    monkeypatch.setitem(globals(), 'Versioned', Versioned2)
+    with pytest.raises(ValueError):
+        pickle.loads(pickled)
+
 def test_eq():
     entity1 = SampleEntity(
         id=1,
@@ -63,3 +117,111 @@ def test_eq():
     assert hash(entity1) == hash(entity1)
     assert hash(entity1) != hash(entity2)
     assert hash(entity1) != hash(entity3)
+
+
+def test_compiled_serializers():
+    """
+    Make sure compiled serializers match the generic ones
+    """
+    class UncompiledSampleEntity(SampleEntity):
+        __compiled__ = False
+        data = fields.BytesField()
+
+    class CompiledSampleEntity(SampleEntity):
+        data = fields.BytesField()
+
+    values = dict(
+        id=1,
+        name='test name',
+        entity=SampleEntity(id=5, date=utcnow()),
+        collection=['a', 'b'],
+        entity_collection=[SampleEntity(id=2), None],
+        date=utcnow(),
+        data=b'\x00\xff',
+    )
+
+    compiled = CompiledSampleEntity(**values)
+    uncompiled = UncompiledSampleEntity(**values)
+
+    assert compiled.jsonify() == uncompiled.jsonify()
+    assert compiled.flatten() == uncompiled.flatten()
+    assert compiled.jsonify()['collection'] is not compiled.collection
+    assert CompiledSampleEntity().jsonify() == {}
+
+
+class CompactSampleEntity(CompactEntity):
+    id = fields.IntField()
+    name = fields.StringField()
+    date = fields.DateTimeField()
+    entity = fields.EntityField('self')
+
+
+def test_compact_entity():
+    """
+    Make sure compact entities behave like regular entities
+    """
+    now = utcnow()
+    entity = CompactSampleEntity(id='1', date=now, **{'entity.name': 'child'})
+
+    assert not hasattr(entity, '__dict__')
+    assert entity.id == 1
+    assert entity.name is None
+    assert entity['entity.name'] == 'child'
+    assert 'id' in entity
+    assert 'name' not in entity
+    assert sorted(entity) == ['date', 'entity', 'id']
+    assert len(entity) == 3
+    assert entity.flatten() == {'id': 1, 'date': now, 'entity': {'name': 'child'}}
+    assert entity.jsonify()['entity'] == {'name': 'child'}
+    assert entity.__changes__ == set(['id', 'date', 'entity'])
+
+    del entity['date']
+    assert entity.date is None
+    assert entity.get(('id', 'date')) == {'id': 1}
+
+    entity2 = pickle.loads(pickle.dumps(entity))
+    assert entity == entity2
+    assert type(entity2.__values__) is CompactSampleEntity.__values_class__
+
+    entity2.name = 'New name'
+    assert entity != entity2
+
+    with pytest.raises(AttributeError):
+        entity.foo = 1
+
+
+class FeedItem(Entity):
+    foo = fields.IntField()
+
+
+class Feed(Entity):
+    items = fields.CollectionField(fields.EntityField(FeedItem), stream=True)
+
+
+def test_streaming_collection():
+    """
+    Make sure streaming collections adapt items as they are written
+    """
+    out = io.StringIO()
+    written = []
+
+    def rows():
+        for i in range(3):
+            written.append(len(out.getvalue()))
+            yield {'foo': i}
+
+    feed = Feed(items=rows())
+    assert isinstance(feed.items, StreamValue)
+    assert written == []
+
+    feed.dump_json(out, chunk_size=1)
+    # Each row was read after the previous one was written
+    assert written[0] < written[1] < written[2]
+    assert json.loads(out.getvalue()) == {'items': [{'foo': 0}, {'foo': 1}, {'foo': 2}]}
+
+    with pytest.raises(ValueError):
+        feed.jsonify()
+
+    assert Feed(items=iter([{'foo': 1}])).jsonify() == {'items': [{'foo': 1}]}
+    # Lists are adapted as usual
+    assert Feed(items=[{'foo': 1}]).items == [FeedItem(foo=1)]
@@ -0,0 +1,120 @@
+import io
+import json
+import pytest
+from springfield import Entity, FlexEntity, fields
+
+
+class Item(Entity):
+    sku = fields.StringField()
+    price = fields.IntField()
+
+
+class Owner(Entity):
+    name = fields.StringField()
+    email = fields.EmailField()
+
+
+class Order(Entity):
+    id = fields.IntField()
+    note = fields.StringField()
+    owner = fields.EntityField(Owner)
+    items = fields.CollectionField(fields.EntityField(Item))
+
+
+DATA = {
+    'id': '1',
+    'note': 'x',
+    'owner': {'name': 'Bob', 'email': 'bob@example.com'},
+    'items': [{'sku': 'a', 'price': 'not a number'}, {'sku': 'b'}],
+}
+
+
+def test_projection():
+    """
+    Make sure only projected fields are adapted and stored
+    """
+    only = ['id', 'owner.name', 'items.*.sku']
+    order = Order.from_json(json.dumps(DATA), only=only)
+    assert order == Order(id=1, owner={'name': 'Bob'}, items=[{'sku': 'a'}, {'sku': 'b'}])
+    assert 'note' not in order
+
+    # Projections are cached regardless of order
+    assert Order.projection(only) is Order.projection(list(reversed(only)))
+
+    # A whole field wins over its nested fields
+    projection = Order.projection(['owner.name', 'owner'])
+    assert projection.filter(DATA) == {'owner': DATA['owner']}
+
+    # Values that are already entities are kept
+    owner = Owner(name='Al')
+    assert Order.projection(['owner.name']).load({'owner': owner}).owner is owner
+
+    orders = list(Order.iter_json(io.StringIO(json.dumps([DATA])), only=['id']))
+    assert orders == [Order(id=1)]
+
+    for only in (['unknown'], ['id.x'], ['owner.*'], ['owner.unknown']):
+        with pytest.raises(KeyError):
+            Order.projection(only)
+
+
+
+def test_masks():
+    """
+    Make sure `jsonify` and `flatten` masks only serialize masked fields
+    """
+    order = Order(
+        id=1,
+        note='x',
+        owner={'name': 'Bob', 'email': 'bob@example.com'},
+        items=[{'sku': 'a', 'price': 2}, {'sku': 'b'}],
+    )
+    assert order.jsonify(include=['id', 'owner.name', 'items.*.sku']) == {
+        'id': 1,
+        'owner': {'name': 'Bob'},
+        'items': [{'sku': 'a'}, {'sku': 'b'}],
+    }
+    assert order.flatten(exclude=['note', 'owner.email', 'items']) == {'id': 1, 'owner': {'name': 'Bob'}}
+    assert order.jsonify(include=['owner', 'items.*'], exclude=['owner.name', 'items.*.price']) == {
+        'owner': {'email': 'bob@example.com'},
+        'items': [{'sku': 'a'}, {'sku': 'b'}],
+    }
+    assert order.jsonify(include=[]) == {}
+    assert order.jsonify(exclude=[]) == order.jsonify()
+
+    # Compiled once per mask
+    count = len(Order.__serializers__)
+    order.jsonify(include=('items.*.sku', 'owner.name', 'id'))
+    assert len(Order.__serializers__) == count
+
+    with pytest.raises(KeyError):
+        order.jsonify(exclude=['owner.unknown'])
+
+
+class Extra(FlexEntity):
+    name = fields.StringField()
+
+
+class Post(Entity):
+    title = fields.StringField()
+    tags = fields.CollectionField(fields.StringField())
+    grid = fields.CollectionField(fields.CollectionField(fields.IntField()))
+    extra = fields.EntityField(Extra)
+
+
+def test_mask_values():
+    """
+    Make sure scalar collections can be masked and entities without masks are rejected
+    """
+    post = Post(title='a', tags=['x', 'y'], grid=[[1]], extra={'name': 'e'})
+    assert post.jsonify(include=['tags.*']) == {'tags': ['x', 'y']}
+    assert post.flatten(include=['tags.*', 'extra']) == {'tags': ['x', 'y'], 'extra': {'name': 'e'}}
+    assert post.jsonify(exclude=['tags.*', 'grid', 'extra']) == {'title': 'a'}
+    # A single path doesn't need a list
+    assert post.jsonify(include='title') == {'title': 'a'}
+    assert post.flatten(exclude='extra') == post.flatten(exclude=['extra'])
+
+    for mask in (['tags.*.x'], ['grid.*.*']):
+        with pytest.raises(KeyError):
+            post.jsonify(include=mask)
+    with pytest.raises(TypeError):
+        post.jsonify(include=['extra.name'])
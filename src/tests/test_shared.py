@@ -0,0 +1,51 @@
+import pickle
+import pytest
+from springfield import Entity, fields
+from springfield.batch import EntityBatch
+
+pytest.importorskip('multiprocessing.shared_memory')
+
+from springfield.shared import SharedBatch  # noqa: E402
+
+
+class Record(Entity):
+    id = fields.IntField()
+    name = fields.StringField()
+
+
+def total(handle):
+    with handle.attach() as batch:
+        return sum(row.id for row in batch)
+
+
+def test_shared_batch():
+    """
+    Make sure workers read entities from shared memory
+    """
+    records = [Record(id=i, name=u'record %d' % i) for i in range(25)]
+    with SharedBatch.create(Record, records) as handle:
+        assert len(handle) == 25
+        # Only the name of the memory is pickled
+        assert len(pickle.dumps(handle)) < 200
+
+        handle2 = pickle.loads(pickle.dumps(handle))
+        with handle2.attach() as batch:
+            assert batch.to_entities() == records
+        with handle2[10:20][::2].attach() as batch:
+            assert batch.to_entities() == records[10:20:2]
+        assert len(handle[::-1][:3]) == 3
+        with handle[::-1][:3].attach() as batch:
+            assert [row.id for row in batch] == [24, 23, 22]
+
+        futures = pytest.importorskip('concurrent.futures')
+        chunks = [handle[i:i + 10] for i in range(0, len(handle), 10)]
+        with futures.ProcessPoolExecutor(max_workers=2) as executor:
+            assert sum(executor.map(total, chunks)) == sum(range(25))
+
+    batch = EntityBatch.from_entities(Record, records)
+    with SharedBatch.create(Record, batch) as handle:
+        with handle.attach() as batch:
+            assert batch[3].to_entity() == records[3]
+
+    with pytest.raises(TypeError):
+        handle[0]